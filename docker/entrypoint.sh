@@ -7,7 +7,7 @@ PORT="${PORT:-8000}"
 # caminhos (ajuste se seu projeto usa paths diferentes)
 DB_PATH="${AMZ_DB_PATH:-/data/db/reviews.db}"
 RAW_CSV="${AMZ_RAW_CSV:-data/raw/reviews_sample.csv}"
-WORKERS="${GUNICORN_WORKERS:-2}"
+WORKERS="${GUNICORN_WORKERS:-1}"
 
 echo "Starting container"
 echo "PORT=${PORT}"
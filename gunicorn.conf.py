@@ -0,0 +1,26 @@
+# gunicorn.conf.py
+# Lido automaticamente pelo gunicorn quando iniciado na raiz do repo:
+#     gunicorn src.app:app
+# Flags da linha de comando (ex.: -w no entrypoint/Procfile) têm precedência.
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# 1 worker por padrão: o registro de jobs de /api/run (status, progresso SSE e o 409
+# de job já rodando) fica na memória do processo. O pipeline, que é o trabalho
+# pesado de CPU, já roda em um processo próprio; aumente só se não usar /api/run.
+workers = int(os.getenv("GUNICORN_WORKERS", "1"))
+
+# threads reais no worker: o sqlite3 libera o GIL durante I/O, então consultas
+# concorrentes se sobrepõem. gthread (e não gevent) porque o pool de conexões
+# SQLite é compartilhado entre threads e o pipeline usa ProcessPoolExecutor.
+# Cada stream SSE de progresso ocupa uma thread enquanto o job roda.
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "16"))
+
+# importa o app uma vez no master antes do fork
+preload_app = True
+
+# /download/export usa send_file, que devolve o wsgi.file_wrapper do gunicorn;
+# com sendfile ligado o arquivo vai do page cache para o socket via sendfile(2)
+sendfile = True
@@ -5,11 +5,20 @@ import sqlite3
 root = os.path.abspath(".")
 candidates = []
 
-# procura arquivos reviews.db em todo o repo
-for dirpath, dirs, files in os.walk(root):
-    for f in files:
-        if f.lower() == "reviews.db":
-            candidates.append(os.path.join(dirpath, f))
+# diretórios que nunca contêm o DB do projeto (e podem ter milhares de arquivos)
+SKIP_DIRS = {".git", "node_modules", ".venv", "venv", "__pycache__", ".pytest_cache", ".ipynb_checkpoints"}
+
+# tenta primeiro o caminho conhecido
+known = os.path.join(root, "data", "db", "reviews.db")
+if os.path.exists(known):
+    candidates.append(known)
+else:
+    # procura arquivos reviews.db no repo, sem descer nos diretórios ignorados
+    for dirpath, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for f in files:
+            if f.lower() == "reviews.db":
+                candidates.append(os.path.join(dirpath, f))
 
 if not candidates:
     print("Nenhum arquivo reviews.db encontrado sob", root)
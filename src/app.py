@@ -1,52 +1,425 @@
+import base64
+import functools
+import itertools
+import multiprocessing
 import os
 import threading
+import time
 import sqlite3
 import re
-from flask import current_app, request, jsonify, Blueprint
-from typing import Dict, Any
-
-import pandas as pd
-from flask import Flask, jsonify, request, send_file, render_template, Response
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict
+
+import orjson
+from flask import (Flask, Response, current_app, jsonify, request, send_file, send_from_directory,
+                   stream_with_context)
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 
+from src.pool import PoolTimeout, get_pool, get_read_conn
+
+
+_ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider do Flask baseado em orjson (usado por jsonify e request.get_json)."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=_ORJSON_OPTS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # orjson já devolve bytes: evita o decode/encode de dumps()
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=_ORJSON_OPTS), mimetype="application/json")
 
-from src.main import run_pipeline
-from src.export import export_for_dashboard
 
 app = Flask(__name__, template_folder="../frontend/templates", static_folder="../frontend/static")
-CORS(app)
+app.json = OrjsonProvider(app)
+# atrás de nginx/Apache, delega o envio de arquivos ao servidor (sendfile no kernel)
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', '0') == '1'
+CORS(app, resources={r"/api/*": {"origins": "*"}}, max_age=86400)
 
 DB_PATH = os.getenv("AMZ_DB_PATH", "data/db/reviews.db")
 RAW_CSV = os.getenv("AMZ_RAW_CSV", "data/raw/reviews.csv")
 EXPORT_CSV = os.getenv("AMZ_EXPORT_CSV", "data/export/reviews_for_dashboard.csv")
 
 
+PRODUCT_NAME_COLUMNS = ('name', 'product_name', 'product_title', 'title', 'reviews_title')
+
+
+def _quote_ident(name):
+    """Identificador SQL entre aspas duplas (aspas internas duplicadas)."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+_PRODUCTS_SQL = "SELECT product_id, MIN({col}) FROM reviews WHERE product_id IS NOT NULL GROUP BY product_id"
+
+# SQL fixo por coluna conhecida: o texto não muda entre requests e o statement
+# preparado fica no cache da conexão
+_PRODUCT_Q = {c: _PRODUCTS_SQL.format(col=_quote_ident(c)) for c in PRODUCT_NAME_COLUMNS}
+
+
+def _product_query(col):
+    """SELECT de /api/products para a coluna col (fora da lista conhecida, com o nome escapado)."""
+    return _PRODUCT_Q.get(col) or _PRODUCTS_SQL.format(col=_quote_ident(col))
+
+
+def _choose_product_name_column(conn):
+    """
+    Verifica colunas da tabela 'reviews' e decide qual coluna usar como
+    'product name'. Retorna nome da coluna preferida ou None.
+    Preferências: PRODUCT_NAME_COLUMNS, depois qualquer coluna com 'title'/'name'.
+    """
+    cols = [r[1] for r in conn.execute("PRAGMA table_info(reviews)").fetchall()]
+    for p in PRODUCT_NAME_COLUMNS:
+        if p in cols:
+            return p
+
+    for c in cols:
+        if 'title' in c or 'name' in c:
+            return c
+    return None
+
+
+def _ensure_indexes(db_path=DB_PATH):
+    """
+    Cria (se necessário) os índices usados pelas consultas da API e roda ANALYZE
+    para o planner do SQLite escolhê-los. Silencioso se o DB/tabela ainda não existe.
+    """
+    if not os.path.exists(db_path):
+        return
+    conn = sqlite3.connect(db_path)
+    try:
+        has_table = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='reviews'"
+        ).fetchone()
+        if not has_table:
+            return
+        conn.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_reviews_date ON reviews(review_date DESC, review_id DESC);
+            CREATE INDEX IF NOT EXISTS idx_reviews_product ON reviews(product_id);
+        """)
+        # índice de cobertura para o GROUP BY de /api/products (não toca a tabela)
+        col = _choose_product_name_column(conn)
+        if col:
+            conn.execute(f'CREATE INDEX IF NOT EXISTS idx_reviews_product_name ON reviews(product_id, {_quote_ident(col)})')
+        conn.execute("ANALYZE")
+    except sqlite3.Error as e:
+        app.logger.warning("Could not create indexes on %s: %s", db_path, e)
+    finally:
+        conn.close()
+
+
+# (caminho absoluto, inode) dos arquivos já passados por _ensure_indexes neste processo
+_indexed_dbs = set()
+_indexed_lock = threading.Lock()
+
+
+def _is_app_db(path):
+    """True se path é o DB configurado do app (AMZ_DB_PATH ou app.config['DB_PATH'])."""
+    configured = {os.path.abspath(DB_PATH), os.path.abspath(app.config.get('DB_PATH', DB_PATH))}
+    return path in configured
+
+
+def _app_pool(db_path):
+    """
+    Pool para db_path. Só o DB configurado do app é alterado: na primeira vez que o
+    app o usa (e de novo se for recriado) cria os índices da API, e o pool abre a
+    conexão de escrita (WAL). Qualquer outro arquivo (ex.: ?db= do cliente) só é
+    lido: pool somente-leitura, sem índices nem PRAGMAs que escrevem. Nada roda
+    no import: importar o app (ex.: nos testes) não escreve no DB padrão.
+    """
+    path = os.path.abspath(db_path)
+    if not _is_app_db(path):
+        return get_pool(path)
+    try:
+        key = (path, os.stat(path).st_ino)
+    except OSError:
+        key = None
+    if key is not None and key not in _indexed_dbs:
+        with _indexed_lock:
+            if key not in _indexed_dbs:
+                _ensure_indexes(path)
+                _indexed_dbs.add(key)
+    return get_pool(path, writable=True)
+
+
+@app.errorhandler(PoolTimeout)
+def pool_timeout(e):
+    """Todas as conexões de leitura ocupadas além do timeout: 503 para o cliente tentar de novo."""
+    app.logger.warning("%s", e)
+    response = jsonify({"error": "db_busy"})
+    response.status_code = 503
+    response.headers["Retry-After"] = "1"
+    return response
+
+
 @app.route("/api/health")
 def health():
     return jsonify({"status": "ok"})
 
 
+_executor = None
+_jobs: Dict[str, Future] = {}
+_job_progress: Dict[str, dict] = {}
+_jobs_lock = threading.Lock()
+
+# jobs terminados mantidos para consulta de status (os mais antigos são descartados)
+JOB_HISTORY = int(os.getenv("AMZ_JOB_HISTORY", "20"))
+# duração máxima de um stream SSE de progresso; o EventSource reconecta sozinho
+SSE_MAX_SECONDS = float(os.getenv("AMZ_SSE_MAX_SECONDS", "300"))
+SSE_POLL_SECONDS = 0.5
+
+# fila de progresso do processo worker (definida pelo initializer do executor)
+_worker_progress_q = None
+
+
+def _init_worker(progress_q):
+    global _worker_progress_q
+    _worker_progress_q = progress_q
+
+
+def _drain_progress(progress_q):
+    """Thread do processo da API: copia os eventos (job_id, etapa, %) do worker para _job_progress."""
+    while True:
+        job_id, stage, pct = progress_q.get()
+        with _jobs_lock:
+            # evento atrasado de um job já descartado: não recria a entrada
+            if job_id in _jobs:
+                _job_progress[job_id] = {"stage": stage, "pct": pct}
+
+
+def _prune_jobs():
+    """Descarta os jobs terminados além dos JOB_HISTORY mais recentes (chamar com _jobs_lock)."""
+    finished = [job_id for job_id, fut in _jobs.items() if fut.done()]
+    for job_id in finished[:max(len(finished) - JOB_HISTORY, 0)]:
+        del _jobs[job_id]
+        _job_progress.pop(job_id, None)
+    # progresso só é lido enquanto o job roda
+    for job_id in finished:
+        _job_progress.pop(job_id, None)
+
+
+def _mp_context():
+    """
+    Contexto de multiprocessing do worker do pipeline: forkserver (spawn onde não
+    existe). Nunca fork: o worker gthread tem outras threads, e um fork enquanto uma
+    delas segura um lock (logging, sqlite, queue) pode deixar o filho travado.
+    """
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+def _get_executor():
+    """ProcessPoolExecutor de 1 worker, criado sob demanda (nada de processos no import)."""
+    global _executor
+    if _executor is None:
+        ctx = _mp_context()
+        progress_q = ctx.Queue()
+        _executor = ProcessPoolExecutor(max_workers=1, mp_context=ctx, initializer=_init_worker,
+                                        initargs=(progress_q,))
+        threading.Thread(target=_drain_progress, args=(progress_q,), daemon=True).start()
+    return _executor
+
+
+def _run_pipeline_job(job_id, **kwargs):
+    """Roda o pipeline no processo worker e devolve só o número de linhas (evita serializar o DataFrame)."""
+    # import tardio: pandas/nltk só são carregados no worker do pipeline
+    from src.main import run_pipeline
+
+    def progress(stage, pct):
+        if _worker_progress_q is not None:
+            _worker_progress_q.put((job_id, stage, pct))
+
+    df = run_pipeline(progress=progress, **kwargs)
+    return len(df)
+
+
 @app.route("/api/run", methods=["POST"])
 def api_run():
     """
-    Inicia o pipeline em background.
+    Inicia o pipeline em background (processo separado).
     JSON body opcional: {"nrows": 100, "out": "path/out.csv", "to_db": true}
+    Retorna {"status": "started", "job_id": ...}; 409 se já houver um job rodando.
     """
     body = request.get_json(silent=True) or {}
     nrows = body.get("nrows")
-    out = body.get("out", "data/processed/reviews_from_api.csv")
+    # artefato intermediário (a API lê do DB): Parquet, menor e sem reparse de texto
+    out = body.get("out", "data/processed/reviews_from_api.parquet")
     to_db = bool(body.get("to_db", True))
     db = body.get("db", DB_PATH)
 
-    def _job():
-        try:
-            run_pipeline(source=RAW_CSV, out=out, to_db=to_db, db_path=db, nrows=nrows, log_level="INFO")
-        except Exception as e:
-            app.logger.exception("Pipeline failed: %s", e)
+    with _jobs_lock:
+        for job_id, fut in _jobs.items():
+            if not fut.done():
+                return jsonify({"error": "job_running", "job_id": job_id}), 409
+        _prune_jobs()
+
+        job_id = uuid.uuid4().hex
+        _job_progress[job_id] = {"stage": "queued", "pct": 0}
+        future = _get_executor().submit(
+            _run_pipeline_job, job_id, source=RAW_CSV, out=out, to_db=to_db, db_path=db, nrows=nrows, log_level="INFO"
+        )
+        _jobs[job_id] = future
+
+    def _on_done(fut):
+        exc = fut.exception()
+        if exc is not None:
+            app.logger.error("Pipeline failed: %s", exc)
+        elif to_db:
+            _ensure_indexes(db)
+            _json_for_version.cache_clear()
+
+    future.add_done_callback(_on_done)
+    return jsonify({"status": "started", "job_id": job_id})
+
+
+def _job_status(job_id, future):
+    """Dict de status do job: running (com etapa/%) | done (com rows) | failed (com error)."""
+    if not future.done():
+        return {"job_id": job_id, "status": "running", **_job_progress.get(job_id, {})}
+    exc = future.exception()
+    if exc is not None:
+        return {"job_id": job_id, "status": "failed", "error": str(exc)}
+    return {"job_id": job_id, "status": "done", "rows": future.result(), "stage": "done", "pct": 100}
+
+
+@app.route("/api/run/<job_id>")
+def api_run_status(job_id):
+    """Status de um job iniciado por POST /api/run: running | done | failed."""
+    future = _jobs.get(job_id)
+    if future is None:
+        return jsonify({"error": "job_not_found"}), 404
+    return jsonify(_job_status(job_id, future))
+
+
+@app.route("/api/run/<job_id>/progress")
+def api_run_progress(job_id):
+    """
+    Server-Sent Events com o andamento do job: um evento a cada mudança de
+    etapa/status (mesmo JSON de /api/run/<job_id>); o stream termina em done/failed,
+    se o job for descartado ou após SSE_MAX_SECONDS (o cliente reconecta), para não
+    prender uma thread do servidor por cliente indefinidamente.
+    """
+    future = _jobs.get(job_id)
+    if future is None:
+        return jsonify({"error": "job_not_found"}), 404
+
+    def events():
+        last = None
+        deadline = time.monotonic() + SSE_MAX_SECONDS
+        while True:
+            status = _job_status(job_id, future)
+            if status != last:
+                yield b"data: " + orjson.dumps(status, option=_ORJSON_OPTS) + b"\n\n"
+                last = status
+            if status["status"] != "running" or _jobs.get(job_id) is not future:
+                return
+            if time.monotonic() >= deadline:
+                return
+            time.sleep(SSE_POLL_SECONDS)
+
+    return Response(events(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+_STATS_SQL = """
+    SELECT
+        COUNT(*),
+        AVG(rating),
+        SUM(sentiment_code = 1) * 100.0 / COUNT(*),
+        SUM(sentiment_code = 0) * 100.0 / COUNT(*),
+        SUM(sentiment_code = -1) * 100.0 / COUNT(*)
+    FROM reviews
+"""
+
+# DBs gerados antes da coluna sentiment_code (ou fora do pipeline)
+_STATS_TEXT_SQL = """
+    SELECT
+        COUNT(*),
+        AVG(rating),
+        SUM(sentiment = 'positive') * 100.0 / COUNT(*),
+        SUM(sentiment = 'neutral') * 100.0 / COUNT(*),
+        SUM(sentiment = 'negative') * 100.0 / COUNT(*)
+    FROM reviews
+"""
+
+_TOP_PRODUCTS_SQL = """
+    SELECT product_id, COUNT(*) AS c
+    FROM reviews
+    WHERE product_id IS NOT NULL
+    GROUP BY product_id
+    ORDER BY c DESC
+    LIMIT 10
+"""
+
+
+def _db_version(db_path):
+    """
+    Versão do DB para cache/ETag: mtime do arquivo principal e do -wal
+    (em WAL as escritas só chegam ao arquivo principal no checkpoint).
+    """
+    st = os.stat(db_path)
+    version = f"{st.st_mtime_ns:x}-{st.st_size:x}"
+    try:
+        wal = os.stat(db_path + "-wal")
+    except OSError:
+        wal = None
+    # -wal vazio (recém-criado ou após checkpoint) não tem escritas pendentes
+    if wal is not None and wal.st_size:
+        version += f"-{wal.st_mtime_ns:x}-{wal.st_size:x}"
+    return version
+
+
+def _compute_stats(db_path):
+    """Agregados de /api/stats."""
+    with get_read_conn(db_path) as conn:
+        cols = [r[1] for r in conn.execute("PRAGMA table_info(reviews)").fetchall()]
+        stats_sql = _STATS_SQL if 'sentiment_code' in cols else _STATS_TEXT_SQL
+        total, avg_rating, pct_pos, pct_neu, pct_neg = conn.execute(stats_sql).fetchone()
+        if not total:
+            return {"total": 0}
+
+        top_products = dict(conn.execute(_TOP_PRODUCTS_SQL).fetchall())
+
+    return {
+        "total": int(total),
+        "avg_rating": float(avg_rating) if avg_rating is not None else None,
+        "pct_pos": float(pct_pos or 0),
+        "pct_neu": float(pct_neu or 0),
+        "pct_neg": float(pct_neg or 0),
+        "top_products": top_products
+    }
+
+
+@functools.lru_cache(maxsize=16)
+def _json_for_version(compute_fn, db_path, version):
+    """JSON (bytes) de compute_fn(db_path), memoizado por versão do DB: serializa uma vez por versão."""
+    return orjson.dumps(compute_fn(db_path), option=_ORJSON_OPTS)
 
-    thread = threading.Thread(target=_job, daemon=True)
-    thread.start()
-    return jsonify({"status": "started"})
+
+def _versioned_json(db, compute_fn):
+    """
+    Resposta JSON de compute_fn(db) com ETag = versão do DB: 304 se o cliente
+    já tem essa versão. no-cache faz o navegador revalidar sempre (304 barato),
+    sem servir dados antigos logo após uma execução do pipeline.
+    """
+    # cria o pool (e, no DB do app, os índices) antes de medir a versão: a conexão de
+    # escrita ativa WAL e reescreve o cabeçalho do arquivo
+    _app_pool(db)
+    version = _db_version(db)
+    if request.if_none_match.contains(version):
+        response = Response(status=304)
+    else:
+        response = app.response_class(_json_for_version(compute_fn, db, version), mimetype="application/json")
+    response.set_etag(version)
+    response.last_modified = os.path.getmtime(db)
+    response.cache_control.no_cache = True
+    return response
 
 
 @app.route("/api/stats")
@@ -54,95 +427,171 @@ def api_stats():
     db = request.args.get("db", DB_PATH)
     if not os.path.exists(db):
         return jsonify({"error": "db_not_found"}), 404
+    return _versioned_json(db, _compute_stats)
 
-    conn = sqlite3.connect(db)
-    try:
-        df = pd.read_sql_query("SELECT rating, sentiment, product_id FROM reviews", conn)
-    finally:
-        conn.close()
 
-    if df.empty:
-        return jsonify({"total": 0})
-
-    total = int(len(df))
-    avg_rating = float(df["rating"].mean())
-    pct_pos = float((df["sentiment"] == "positive").mean() * 100)
-    pct_neu = float((df["sentiment"] == "neutral").mean() * 100)
-    pct_neg = float((df["sentiment"] == "negative").mean() * 100)
-    top_products = df["product_id"].value_counts().head(10).to_dict()
-    return jsonify({
-        "total": total,
-        "avg_rating": avg_rating,
-        "pct_pos": pct_pos,
-        "pct_neu": pct_neu,
-        "pct_neg": pct_neg,
-        "top_products": top_products
-    })
+def _encode_cursor(review_date, review_id):
+    """Codifica (review_date, review_id) da última linha em um cursor opaco (base64 de JSON)."""
+    raw = orjson.dumps([review_date, review_id])
+    return base64.urlsafe_b64encode(raw).decode("ascii")
 
 
-def _connect_db(db_path=None):
-    """
-    Conecta ao SQLite. Se db_path não for informado, tenta pegar current_app.config['DB_PATH']
-    ou usa o padrão 'data/db/reviews.db'.
-    Retorna conexão com row_factory = sqlite3.Row (permite dict-like rows).
-    """
-    if db_path is None:
-        try:
-            db_path = current_app.config.get('DB_PATH', 'data/db/reviews.db')
-        except RuntimeError:
-            db_path = 'data/db/reviews.db'
+def _decode_cursor(cursor):
+    """Decodifica um cursor gerado por _encode_cursor. Levanta ValueError se inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii"))
+        review_date, review_id = orjson.loads(raw)
+    except Exception as e:
+        raise ValueError(f"invalid cursor: {cursor}") from e
+    return review_date, review_id
+
+
+_REVIEWS_COLUMNS = ["review_id", "product_id", "review_date", "rating", "sentiment", "keywords", "review_text"]
+_REVIEW_ID_IDX = _REVIEWS_COLUMNS.index("review_id")
+_REVIEW_DATE_IDX = _REVIEWS_COLUMNS.index("review_date")
+_REVIEWS_COLUMNS_JSON = orjson.dumps(_REVIEWS_COLUMNS)
+
+_REVIEWS_SQL_TEMPLATE = """
+    SELECT
+        """ + ",\n        ".join(_REVIEWS_COLUMNS) + """{total}
+    FROM reviews
+    {where}
+    ORDER BY review_date DESC, review_id DESC
+    LIMIT ?
+"""
+
+# Comparação por row value vira busca por faixa no índice (review_date, review_id).
+# Ela exclui NULLs, que ordenam por último em DESC: quando a página "after" acaba
+# antes do limite, ela continua nas linhas sem data ("null_dates").
+_REVIEWS_WHERE = {
+    "first": "",
+    "after": "WHERE (review_date, review_id) < (?, ?)",
+    "null_dates": "WHERE review_date IS NULL",
+    "after_null_date": "WHERE review_date IS NULL AND review_id < ?",
+}
+
+# with_total=1 traz o COUNT(*) na mesma consulta (subquery não correlacionada,
+# avaliada uma vez); COUNT(*) OVER () contaria só as linhas após o cursor.
+_SELECT_REVIEWS_SQL = {
+    (kind, with_total): _REVIEWS_SQL_TEMPLATE.format(
+        where=where,
+        total=",\n        (SELECT COUNT(*) FROM reviews) AS total" if with_total else "",
+    )
+    for kind, where in _REVIEWS_WHERE.items()
+    for with_total in (False, True)
+}
+
+_COUNT_SQL = "SELECT COUNT(*) FROM reviews"
 
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
 
 @app.route('/api/reviews')
 def api_reviews():
     """
-    GET /api/reviews?limit=50&offset=0
+    GET /api/reviews?limit=50&cursor=<next_cursor>
     - limit: quantas linhas retornar (int, padrão 50, máximo 5000)
-    - offset: deslocamento (int, padrão 0)
-    Retorna JSON array de objetos.
+    - cursor: valor de 'next_cursor' da página anterior (keyset pagination,
+      ordenado por review_date DESC, review_id DESC); omitido na primeira página
+    - with_total=1: inclui 'total' (COUNT(*) da tabela) na resposta
+    Retorna em formato colunar (sem repetir as chaves em cada linha):
+    {"columns": [...], "data": [[...], ...], "next_cursor": str | null}.
     """
     try:
         limit = int(request.args.get('limit', 50))
-        offset = int(request.args.get('offset', 0))
     except (TypeError, ValueError):
-        return jsonify({"error": "limit and offset must be integers"}), 400
+        return jsonify({"error": "limit must be an integer"}), 400
 
     if limit < 1:
         limit = 1
     if limit > 5000:
         limit = 5000
-    if offset < 0:
-        offset = 0
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            last_date, last_id = _decode_cursor(cursor)
+        except ValueError:
+            return jsonify({"error": "invalid cursor"}), 400
+    with_total = request.args.get('with_total') in ('1', 'true')
 
     db_path = current_app.config.get('DB_PATH', 'data/db/reviews.db') if hasattr(current_app, 'config') else 'data/db/reviews.db'
     if not os.path.exists(db_path):
         return jsonify({"error": "db_not_found", "path": db_path}), 500
 
-    query = """
-        SELECT
-            review_id,
-            product_id,
-            review_date,
-            rating,
-            sentiment,
-            keywords,
-            review_text
-        FROM reviews
-        ORDER BY review_date DESC
-        LIMIT ? OFFSET ?
-    """
-
-    conn = _connect_db(db_path)
-    try:
-        cur = conn.execute(query, (limit, offset))
-        rows = [dict(r) for r in cur.fetchall()]
-    finally:
-        conn.close()
+    if not cursor:
+        kind, params = "first", (limit,)
+    elif last_date is None:
+        kind, params = "after_null_date", (last_id, limit)
+    else:
+        kind, params = "after", (last_date, last_id, limit)
+
+    pool = _app_pool(db_path)
+    # conexão e consulta antes de montar a resposta: PoolTimeout (503) e erros de SQL
+    # viram o status da resposta, em vez de um 200 com o corpo cortado
+    conn = pool.acquire()
+    # tuplas simples (sem sqlite3.Row): o orjson serializa direto como arrays
+    cur = conn.cursor()
+    cur.row_factory = None
+    released = False
+
+    def release():
+        # fim do corpo, close() da resposta ou HEAD: devolve a conexão uma vez só
+        nonlocal released
+        if not released:
+            released = True
+            cur.close()
+            pool.release(conn)
 
-    return jsonify({"total": len(rows), "rows": rows})
+    try:
+        cur.execute(_SELECT_REVIEWS_SQL[(kind, with_total)], params)
+    except Exception:
+        release()
+        raise
+
+    if request.method == 'HEAD':
+        # o corpo de um HEAD nunca é lido: nada de segurar a conexão até o close()
+        release()
+        return Response(mimetype='application/json')
+
+    def _rows(cur):
+        n = 0
+        for r in cur:
+            n += 1
+            yield r
+        if kind == "after" and n < limit:
+            yield from cur.execute(_SELECT_REVIEWS_SQL[("null_dates", with_total)], (limit - n,))
+
+    def generate():
+        try:
+            # escreve cada linha assim que sai do cursor; next_cursor vai no final
+            yield b'{"columns":' + _REVIEWS_COLUMNS_JSON + b',"data":['
+            count = 0
+            last = None
+            total = None
+            for r in _rows(cur):
+                if count:
+                    yield b','
+                if with_total:
+                    total = r[-1]
+                    r = r[:-1]
+                last = r
+                yield orjson.dumps(r)
+                count += 1
+            next_cursor = None
+            if count == limit:
+                next_cursor = _encode_cursor(last[_REVIEW_DATE_IDX], last[_REVIEW_ID_IDX])
+            yield b'],"next_cursor":' + orjson.dumps(next_cursor)
+            if with_total:
+                if total is None:
+                    total = conn.execute(_COUNT_SQL).fetchone()[0]
+                yield b',"total":' + orjson.dumps(total)
+            yield b'}'
+        finally:
+            release()
+
+    response = Response(stream_with_context(generate()), mimetype='application/json')
+    # cliente que desconecta antes do primeiro chunk: o servidor chama close() sem iterar o corpo
+    response.call_on_close(release)
+    return response
 
 
 @app.route("/api/export")
@@ -156,8 +605,10 @@ def api_export():
     out_dir = os.path.dirname(out) or "."
     os.makedirs(out_dir, exist_ok=True)
 
+    from src.export import export_for_dashboard_streaming
+
     try:
-        path, rows = export_for_dashboard(db_path=db, out_path=out)
+        path, rows = export_for_dashboard_streaming(db_path=db, out_path=out)
         rel_path = os.path.relpath(path, start=os.getcwd())
         return jsonify({"path": rel_path, "rows": rows})
     except Exception as e:
@@ -165,18 +616,39 @@ def api_export():
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/download/export")
-def download_export():
+@app.route("/api/export/stream")
+def api_export_stream():
     """
-    Download direto do CSV de export.
-    Procura o arquivo em:
+    Baixa o CSV de export gerado sob demanda, em streaming a partir do cursor
+    do SQLite (memória limitada a um lote; o primeiro byte sai imediatamente).
+    """
+    from src.export import iter_dashboard_csv
+
+    db = request.args.get("db", DB_PATH)
+    if not os.path.exists(db):
+        return jsonify({"error": "db_not_found"}), 404
+
+    chunks = iter_dashboard_csv(db)
+    try:
+        header = next(chunks)
+    except Exception as e:
+        app.logger.exception("Export stream failed: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+    return Response(
+        stream_with_context(itertools.chain([header], chunks)),
+        mimetype="text/csv",
+        headers={"Content-Disposition": "attachment; filename=reviews.csv"},
+    )
+
+
+def _export_candidates(cfg_path):
+    """
+    Caminhos onde o CSV de export pode estar:
       1) caminho absoluto informado via env var (AMZ_EXPORT_CSV)
       2) caminho relativo à working dir atual (os.getcwd())
       3) caminho relativo ao app.root_path (normalmente 'src/')
-    Retorna 404 se não encontrar.
     """
-    cfg_path = os.getenv("AMZ_EXPORT_CSV", EXPORT_CSV)
-
     candidates = []
     if os.path.isabs(cfg_path):
         candidates.append(cfg_path)
@@ -185,45 +657,68 @@ def download_export():
         candidates.append(os.path.abspath(os.path.join(app.root_path, cfg_path)))
         candidates.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", cfg_path)))
 
-
     seen = set()
-    candidates = [p for p in candidates if not (p in seen or seen.add(p))]
+    return [p for p in candidates if not (p in seen or seen.add(p))]
 
 
-    found = None
-    for p in candidates:
-        if os.path.exists(p):
-            found = p
+# dependem só de env vars e do root_path: calculados uma vez no import
+_EXPORT_CANDIDATES = _export_candidates(EXPORT_CSV)
+_EXPORT_RESOLVED = None  # (path, mtime) do último arquivo encontrado
+
+
+def _resolve_export_file():
+    """
+    Retorna (path, mtime) do CSV de export ou None. Reaproveita o último caminho
+    encontrado enquanto o mtime não mudar; senão sonda os candidatos de novo.
+    """
+    global _EXPORT_RESOLVED
+    if _EXPORT_RESOLVED is not None:
+        path, mtime = _EXPORT_RESOLVED
+        try:
+            if os.path.getmtime(path) == mtime:
+                return _EXPORT_RESOLVED
+        except OSError:
+            pass
+
+    _EXPORT_RESOLVED = None
+    for p in _EXPORT_CANDIDATES:
+        try:
+            _EXPORT_RESOLVED = (p, os.path.getmtime(p))
             break
+        except OSError:
+            continue
+    return _EXPORT_RESOLVED
 
-    if not found:
+
+@app.route("/download/export")
+def download_export():
+    """
+    Download direto do CSV de export (ver _export_candidates para onde é procurado).
+    Retorna 404 se não encontrar.
+    """
+    resolved = _resolve_export_file()
+    if not resolved:
 
         return jsonify({
             "error": "file_not_found",
-            "requested": cfg_path,
-            "checked_paths": candidates
+            "requested": EXPORT_CSV,
+            "checked_paths": _EXPORT_CANDIDATES
         }), 404
 
-    return send_file(found, as_attachment=True, download_name=os.path.basename(found))
+    found, mtime = resolved
+    return send_file(found, as_attachment=True, download_name=os.path.basename(found),
+                     conditional=True, etag=True, last_modified=mtime)
 
 
-def _choose_product_name_column(conn):
-    """
-    Verifica colunas da tabela 'reviews' e decide qual coluna usar como
-    'product name'. Retorna nome da coluna preferida ou None.
-    Preferências: 'name', 'product_name', 'product_title', 'title', 'reviews_title'
-    """
-    prefs = ['name', 'product_name', 'product_title', 'title', 'reviews_title']
-    cols = [r[1] for r in conn.execute("PRAGMA table_info(reviews)").fetchall()]
-    for p in prefs:
-        if p in cols:
-            return p
+_PAREN_RE = re.compile(r'\(.*?\)')
+_WS_RE = re.compile(r'\s+')
+_SPLIT_RE = re.compile(r'[,–\-]')
+_TOK_RE = re.compile(r'[\s/]+')
+_DIGIT_RE = re.compile(r'\d')
+_QUOTE_RE = re.compile(r'["\']')
 
-    for c in cols:
-        if 'title' in c or 'name' in c:
-            return c
-    return None
 
+@functools.lru_cache(maxsize=8192)
 def simplify_product_name(name: str) -> str:
     """
     Heurística para reduzir o nome do produto:
@@ -237,13 +732,13 @@ def simplify_product_name(name: str) -> str:
         return ""
     s = str(name)
 
-    s = re.sub(r'\(.*?\)', '', s)
+    s = _PAREN_RE.sub('', s)
 
-    s = re.sub(r'\s+', ' ', s).strip()
+    s = _WS_RE.sub(' ', s).strip()
 
-    seg = re.split(r'[,–\-]', s)[0].strip()
+    seg = _SPLIT_RE.split(s, maxsplit=1)[0].strip()
 
-    tokens = [t for t in re.split(r'[\s/]+', seg) if t and not re.search(r'\d', t)]
+    tokens = [t for t in _TOK_RE.split(seg) if t and not _DIGIT_RE.search(t)]
 
     if not tokens:
         tokens = [w for w in seg.split() if w]
@@ -256,7 +751,7 @@ def simplify_product_name(name: str) -> str:
             break
     friendly = " ".join(out_tokens).strip()
 
-    friendly = re.sub(r'["\']', '', friendly)
+    friendly = _QUOTE_RE.sub('', friendly)
     return friendly
 
 
@@ -271,37 +766,41 @@ def api_products():
     db = request.args.get("db", DB_PATH)
     if not os.path.exists(db):
         return jsonify({}), 404
+    return _versioned_json(db, _compute_products)
 
-    conn = _connect_db(db)
-    try:
+
+def _compute_products(db_path):
+    """Mapping de /api/products."""
+    with get_read_conn(db_path) as conn:
         col = _choose_product_name_column(conn)
         mapping = {}
         if col:
 
-            q = f"SELECT product_id, {col} FROM reviews WHERE product_id IS NOT NULL"
-            cur = conn.execute(q)
-            for row in cur.fetchall():
-                pid = row['product_id']
-                raw = row[col] or ''
-
-                mapping[pid] = simplify_product_name(raw) or pid
+            # um nome por produto, agregado no SQL: só os pares distintos chegam ao Python
+            cur = conn.execute(_product_query(col))
+            for pid, raw in cur.fetchall():
+                mapping[pid] = simplify_product_name(raw or '') or pid
         else:
 
             cur = conn.execute("SELECT DISTINCT product_id FROM reviews")
             for row in cur.fetchall():
                 pid = row['product_id']
                 mapping[pid] = pid
-    finally:
-        conn.close()
 
-    return jsonify(mapping)
+    return mapping
 
 
 @app.route("/")
 def index():
-    return render_template("index.html")
+    # index.html não tem diretivas Jinja: envia o arquivo direto (com ETag/304)
+    return send_from_directory(app.template_folder, "index.html")
 
 
 if __name__ == "__main__":
-    port = int(os.getenv("PORT", 8000))
-    app.run(host="0.0.0.0", port=port, debug=True)
+    # servidor de desenvolvimento (single-thread) só quando pedido explicitamente;
+    # para servir de verdade use gunicorn (config em gunicorn.conf.py)
+    if os.getenv("USE_DEV_SERVER") == "1":
+        port = int(os.getenv("PORT", 8000))
+        app.run(host="0.0.0.0", port=port, debug=True)
+    else:
+        print("Use: gunicorn src.app:app  (ou USE_DEV_SERVER=1 python -m src.app para o servidor de dev)")
@@ -1,11 +1,16 @@
+import pandas as pd
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import Column, String, Float, Integer
+from sqlalchemy import Column, String, Float, Integer, Index
+from sqlalchemy.schema import CreateIndex
 
 Base = declarative_base()
 
 class Review(Base):
     __tablename__ = 'reviews'
+    __table_args__ = (
+        Index('idx_reviews_product', 'product_id'),
+    )
     review_id = Column(String, primary_key=True)
     product_id = Column(String)
     review_text = Column(String)
@@ -23,14 +28,113 @@ class Review(Base):
     review_word_count = Column(Integer)
     clean_text = Column(String)
     sentiment = Column(String)
+    sentiment_code = Column(Integer)
     keywords = Column(String)
 
+# paginação de /api/reviews (ORDER BY review_date DESC, review_id DESC, keyset pelo par)
+Index('idx_reviews_date', Review.__table__.c.review_date.desc(), Review.__table__.c.review_id.desc())
+
 def init_db(db_path='data/db/reviews.db'):
     """Inicializa banco SQLite e retorna engine"""
     engine = create_engine(f'sqlite:///{db_path}', echo=False)
     Base.metadata.create_all(engine)
     return engine
 
-def save_df(engine, df, table_name='reviews'):
-    """Salva DataFrame em tabela SQL usando SQLAlchemy engine"""
-    df.to_sql(table_name, engine, if_exists='replace', index=False)
+# tipos SQL por pd.api.types.infer_dtype (os mesmos que to_sql gera no SQLite)
+_SQL_TYPES = {
+    'boolean': 'BOOLEAN',
+    'integer': 'BIGINT',
+    'floating': 'FLOAT',
+    'mixed-integer-float': 'FLOAT',
+    'datetime64': 'TIMESTAMP',
+    'datetime': 'TIMESTAMP',
+}
+
+SAVE_CHUNK_ROWS = 50000
+
+_BULK_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA cache_size=-65536;
+    PRAGMA temp_store=MEMORY;
+"""
+
+def _infer_dtype(s):
+    """Tipo inferido da coluna; category usa o tipo das suas categorias."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        s = s.cat.categories
+    return pd.api.types.infer_dtype(s, skipna=True)
+
+def _column_values(s):
+    """Valores da coluna como objetos Python aceitos pelo sqlite3 (NaN/NaT -> None, datas em texto)."""
+    if pd.api.types.is_datetime64_any_dtype(s):
+        if s.dt.tz is not None:
+            s = s.dt.tz_convert('UTC').dt.tz_localize(None)
+        s = s.dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+    return s.astype(object).where(s.notna(), None).tolist()
+
+def _iter_rows(df, chunk_rows):
+    """Tuplas de linha do df, convertidas um bloco de chunk_rows linhas por vez (memória limitada ao bloco)."""
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        yield from zip(*(_column_values(chunk[c]) for c in chunk.columns))
+
+def save_df(engine, df, table_name='reviews', chunk_rows=SAVE_CHUNK_ROWS):
+    """
+    Substitui a tabela pelo conteúdo do DataFrame (mesmo efeito de to_sql(if_exists='replace')).
+
+    Recria a tabela com as colunas do df e insere tudo com um único executemany
+    (INSERT OR REPLACE, statement preparado) dentro de uma transação, direto no
+    sqlite3 — sem o overhead por linha do SQLAlchemy. As linhas são convertidas para
+    objetos Python em blocos de chunk_rows, consumidos pelo executemany à medida que
+    são gerados. review_id vira PRIMARY KEY como no modelo Review; os índices do modelo
+    são criados na mesma transação (um único commit para a carga inteira).
+    """
+    cols = [str(c) for c in df.columns]
+    defs = []
+    for c in cols:
+        sql_type = _SQL_TYPES.get(_infer_dtype(df[c]), 'TEXT')
+        defs.append(f'"{c}" {sql_type}' + (' PRIMARY KEY' if c == 'review_id' else ''))
+    col_list = ", ".join(f'"{c}"' for c in cols)
+    insert = f'INSERT OR REPLACE INTO "{table_name}" ({col_list}) VALUES ({", ".join("?" * len(cols))})'
+
+    rows = _iter_rows(df, chunk_rows)
+
+    index_ddl = []
+    if table_name == Review.__tablename__:
+        # a tabela é recriada sem os índices do modelo
+        index_ddl = [str(CreateIndex(idx).compile(dialect=engine.dialect))
+                     for idx in Review.__table__.indexes
+                     if all(c.name in df.columns for c in idx.columns)]
+
+    raw = engine.raw_connection()
+    try:
+        conn = raw.driver_connection
+        conn.executescript(_BULK_PRAGMAS)
+        # DROP/CREATE/INSERT na mesma transação: leitores veem a tabela antiga até o commit
+        conn.execute("BEGIN")
+        try:
+            conn.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+            conn.execute(f'CREATE TABLE "{table_name}" ({", ".join(defs)})')
+            conn.executemany(insert, rows)
+            for ddl in index_ddl:
+                conn.execute(ddl)
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    finally:
+        raw.close()
+
+SENTIMENT_CODES = {'positive': 1, 'neutral': 0, 'negative': -1}
+
+def with_sentiment_code(df):
+    """
+    Cópia rasa do df com a coluna inteira sentiment_code (1=positive, 0=neutral, -1=negative),
+    para agregações por sentimento compararem inteiros em vez de texto. Vai no mesmo INSERT
+    do save_df: leitores nunca veem a coluna vazia.
+    """
+    if 'sentiment' not in df.columns:
+        return df
+    codes = df['sentiment'].astype(object).map(SENTIMENT_CODES).astype('Int8')
+    return df.assign(sentiment_code=codes)
@@ -1,9 +1,31 @@
 import ast
+from collections import Counter
+import numpy as np
 import pandas as pd
 import os
 
+# leitor CSV do PyArrow (multithread) é opcional; sem ele extract usa pandas.read_csv
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.compute as pc  # type: ignore
+    from pyarrow import csv as pacsv  # type: ignore
+
+    _ARROW_AVAILABLE = True
+except Exception:
+    pa = None  # type: ignore
+    pc = None  # type: ignore
+    pacsv = None  # type: ignore
+    _ARROW_AVAILABLE = False
+
+def backend_state():
+    """Backends opcionais em uso: {'pyarrow': bool} (leitor CSV e kernels de string do Arrow)."""
+    return {'pyarrow': _ARROW_AVAILABLE}
+
 def extract_first_asin(val):
-    """Tenta extrair um ASIN único a partir de formatos comuns."""
+    """
+    Tenta extrair um ASIN único a partir de formatos comuns.
+    Mantido por compatibilidade (valor a valor); transform usa extract_first_asins.
+    """
     if pd.isna(val):
         return None
     s = str(val).strip()
@@ -19,31 +41,182 @@ def extract_first_asin(val):
             return cand.strip(" []'\"")
     return s.strip(" []'\"")
 
+_ASIN_SEPS = [',', '|', ';', ' ']
+
+# Valores em que ast.literal_eval não pode devolver lista/tupla, e extract_first_asin
+# sempre cai na divisão por separador: sem ',', '[' ou '(' (não há como escrever lista
+# ou tupla), ou com um nome como primeiro elemento (B01,B02: literal_eval rejeita nomes)
+_NO_LIST_CHARS_RE = r"[,\[(]"
+_NAME_FIRST_RE = r"(?!(?:True|False|None)\s*(?:,|$))[A-Za-z_][A-Za-z0-9_]*\s*(?:,|$)"
+
+def extract_first_asins(values):
+    """
+    Versão de extract_first_asin para uma Series inteira: mesmo resultado elemento a
+    elemento; nulos viram None. A divisão por separador roda vetorizada (operações .str);
+    valores que podem ser listas/tuplas literais ('[...]', '(...)', '1,2') passam pela
+    própria extract_first_asin.
+
+    Os ASINs se repetem em todas as reviews do produto: a extração roda só sobre os
+    valores distintos (pd.factorize) e o resultado é espalhado de volta pelos códigos.
+    """
+    codes, uniques = pd.factorize(values)
+    first_asins = _extract_first_asins_unique(pd.Series(uniques, dtype=object)).to_numpy(dtype=object)
+    # código -1 = valor nulo
+    out = np.where(codes >= 0, first_asins.take(codes, mode='clip') if len(first_asins) else None, None)
+    return pd.Series(out, index=values.index, dtype=object)
+
+def _extract_first_asins_unique(values):
+    """extract_first_asins aplicada a uma Series sem repetições e sem nulos."""
+    s = values.astype('string').str.strip()
+    simple = (~s.str.contains(_NO_LIST_CHARS_RE)) | s.str.match(_NAME_FIRST_RE)
+    simple = simple.fillna(False).to_numpy(bool)
+
+    out = pd.Series(None, index=values.index, dtype=object)
+    if simple.any():
+        s = s[simple]
+        # mesmo critério da versão escalar: o primeiro separador da lista que aparecer no texto
+        conds = [s.str.contains(sep, regex=False).fillna(False).to_numpy(bool) for sep in _ASIN_SEPS]
+        parts = [s.str.split(sep, n=1, regex=False).str[0] for sep in _ASIN_SEPS]
+        split = pd.Series(np.select(conds, parts, default=s), index=s.index, dtype='string')
+        out[simple] = split.str.strip(" []'\"").astype(object)
+    if not simple.all():
+        out[~simple] = values[~simple].map(extract_first_asin)
+    return out
+
+# espaço, ponto e hífen viram '_' numa única passada (str.translate)
+_COLNAME_TABLE = str.maketrans({' ': '_', '.': '_', '-': '_'})
+
 def normalize_colnames(cols):
     """Normaliza lista de colunas para snake_case simples."""
-    out = []
-    for c in cols:
-        if c is None:
-            out.append(c)
-            continue
-        n = str(c).strip().lower().replace(' ', '_').replace('.', '_').replace('-', '_')
-        out.append(n)
-    return out
+    return [None if c is None else str(c).strip().lower().translate(_COLNAME_TABLE) for c in cols]
+
+# valores lidos como nulos por padrão no pandas.read_csv
+_NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+              '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+# formato que nunca casa: desliga a inferência de timestamp do pyarrow
+_NO_TIMESTAMP = '\x01'
+
+# colunas de texto livre (nomes crus do CSV): sempre string, sem inferência. Evita que
+# um bloco inicial só com números (ex.: username "1234") fixe um tipo numérico
+_TEXT_COLUMNS = ('id', 'name', 'asins', 'reviews.text', 'reviews.title', 'reviews.username',
+                 'reviews_text', 'review_text', 'reviews_title', 'reviews_username')
+
+def _read_csv_arrow(path, usecols=None, nrows=None):
+    """
+    Lê o CSV com pyarrow.csv (parser multithread) e converte para pandas.
+    Mantém os tipos do pandas.read_csv: datas ficam como texto (o parse é feito em
+    transform) e os mesmos valores viram nulos. Com nrows, lê só os blocos necessários.
+    """
+    convert = pacsv.ConvertOptions(
+        include_columns=usecols,
+        column_types={c: pa.string() for c in _TEXT_COLUMNS},
+        strings_can_be_null=True,
+        null_values=_NA_VALUES,
+        timestamp_parsers=[_NO_TIMESTAMP],
+    )
+    if nrows is None:
+        table = pacsv.read_csv(path, convert_options=convert)
+    else:
+        # leitor em streaming: para de ler assim que tiver nrows linhas
+        reader = pacsv.open_csv(path, convert_options=convert)
+        batches, n = [], 0
+        try:
+            for batch in reader:
+                batches.append(batch)
+                n += batch.num_rows
+                if n >= nrows:
+                    break
+        finally:
+            reader.close()
+        table = pa.Table.from_batches(batches, schema=reader.schema).slice(0, nrows)
+
+    # date32/time32 só são inferidos de texto ISO exato: voltar para string é sem perda
+    for i, field in enumerate(table.schema):
+        if pa.types.is_date(field.type) or pa.types.is_time(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+    df = table.to_pandas(self_destruct=True)
+    # colunas object (texto, bool com nulos): o Arrow devolve None nos nulos, o
+    # pandas.read_csv devolve NaN; astype(str) de None viraria o texto "None"
+    for c in df.columns[df.dtypes == object]:
+        df[c] = df[c].where(df[c].notna(), np.nan)
+    return df
+
+def _is_parquet(path):
+    return str(path).lower().endswith('.parquet')
 
 def extract(path, usecols=None, nrows=None):
     """
-    Lê CSV e retorna um DataFrame.
-    - path: caminho para o CSV (relativo ao root do projeto).
+    Lê CSV (ou Parquet, pela extensão .parquet) e retorna um DataFrame.
+    - path: caminho para o arquivo (relativo ao root do projeto).
     - usecols: lista de colunas a ler (opcional).
     - nrows: int (opcional) para desenvolvimento rápido.
     """
     if not os.path.exists(path):
         raise FileNotFoundError(f"Arquivo não encontrado: {path}")
-    df = pd.read_csv(path, low_memory=False, usecols=usecols, nrows=nrows)
+    df = None
+    if _is_parquet(path):
+        # colunar: lê só as colunas pedidas, sem parse de texto nem inferência de tipos
+        df = pd.read_parquet(path, columns=usecols)
+        if nrows is not None:
+            df = df.iloc[:nrows]
+    elif _ARROW_AVAILABLE:
+        try:
+            df = _read_csv_arrow(path, usecols=usecols, nrows=nrows)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            # ex.: coluna cujo tipo inferido no primeiro bloco não vale para o resto do arquivo
+            df = None
+    if df is None:
+        df = pd.read_csv(path, low_memory=False, usecols=usecols, nrows=nrows,
+                         dtype={c: str for c in _TEXT_COLUMNS})
     df.columns = normalize_colnames(df.columns)
     print(f"[extract] lido {len(df)} linhas e {len(df.columns)} colunas de {path}")
     return df
 
+# \S+ do Python (whitespace unicode, igual a str.split()) em sintaxe RE2, onde \s é só ASCII
+_WORD_RE2 = r'[^\s\x0b\x1c-\x1f\x85\p{Z}]+'
+
+def _text_features(text):
+    """
+    Para a coluna de texto (já str ou string[pyarrow]): (review_len, review_word_count,
+    máscara de texto válido). Com pyarrow usa os kernels do Arrow sobre o buffer contíguo
+    (sem cópia se a Series já é string[pyarrow]); senão, os .str do pandas.
+    Texto válido: não vazio após strip e diferente de 'nan' (o astype(str) de um NaN).
+    "Não vazio após strip" é o mesmo que ter ao menos uma palavra: a máscara reaproveita a
+    contagem e só faz mais uma passada (o 'nan' sem diferenciar maiúsculas), sem gerar
+    cópias do texto com strip/lower.
+    """
+    if _ARROW_AVAILABLE:
+        arr = pa.array(text, type=pa.string())
+        length = pc.cast(pc.utf8_length(arr), pa.int64()).to_numpy()
+        words = pc.cast(pc.count_substring_regex(arr, _WORD_RE2), pa.int64()).to_numpy()
+        is_nan = pc.match_substring_regex(arr, '^nan$', ignore_case=True).to_numpy(zero_copy_only=False)
+        valid = (words > 0) & ~is_nan
+        return pd.Series(length, index=text.index), pd.Series(words, index=text.index), valid
+
+    # conta os tokens sem materializar as listas de split()
+    words = text.str.count(r'\S+')
+    valid = text.notna() & (words > 0) & ~text.str.fullmatch('nan', case=False, na=False)
+    return text.str.len(), words, valid
+
+def _to_datetime_unique(values):
+    """
+    pd.to_datetime(errors='coerce', utc=True) parseando só os valores distintos
+    (datas de review se repetem muito) e espalhando o resultado pelos códigos do factorize.
+    O cache interno do pandas decide por amostragem das primeiras linhas; aqui é sempre aplicado.
+    """
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Index(uniques), errors='coerce', utc=True)
+    # posição extra com NaT para o código -1 (valor nulo)
+    parsed = parsed.append(pd.DatetimeIndex([pd.NaT], tz='UTC'))
+    return pd.Series(parsed.take(codes), index=values.index)
+
+def _first_non_null(frame):
+    """Primeiro valor não nulo de cada linha, da esquerda para a direita (bfill(axis=1).iloc[:, 0])."""
+    result = frame.iloc[:, 0]
+    for i in range(1, frame.shape[1]):
+        result = result.where(result.notna(), frame.iloc[:, i])
+    return result
+
 def transform(df):
     """
     Recebe DataFrame cru (com col names normalizados) e devolve DataFrame limpo.
@@ -52,8 +225,6 @@ def transform(df):
     - extrai product_id (ASIN), converte rating, datas, cria features simples,
       remove reviews sem texto e duplicatas.
     """
-    df = df.copy()
-
     mapping_candidates = {
         'reviews_id': 'review_id',
         'review_id': 'review_id',
@@ -77,53 +248,92 @@ def transform(df):
         'primarycategories': 'primarycategories'
     }
     mapping = {k: v for k, v in mapping_candidates.items() if k in df.columns}
-    if mapping:
-        df = df.rename(columns=mapping)
+    # rename sempre devolve um novo DataFrame (sem copiar os dados): as atribuições
+    # de coluna abaixo não alteram o df do chamador
+    df = df.rename(columns=mapping, copy=False)
 
-    cols = df.columns.tolist()
-    dup_names = [name for name in set(cols) if cols.count(name) > 1]
-    for dup in dup_names:
-        df_dup = df.loc[:, [c for c in df.columns if c == dup]]
-        combined = df_dup.bfill(axis=1).iloc[:, 0]
-        df = df.loc[:, ~pd.Index(df.columns).isin([dup])]
-        df[dup] = combined
+    dup_names = [name for name, n in Counter(df.columns).items() if n > 1]
+    if dup_names:
+        # todas as colunas repetidas combinadas de uma vez e o df remontado uma única vez
+        # (colunas únicas na ordem original, combinadas no final)
+        is_dup = df.columns.isin(dup_names)
+        dups = df.loc[:, is_dup]
+        combined = pd.DataFrame({dup: _first_non_null(dups[dup]) for dup in dup_names}, index=df.index)
+        df = pd.concat([df.loc[:, ~is_dup], combined], axis=1)
 
     if 'product_id' in df.columns:
-        df['product_id'] = df['product_id'].apply(extract_first_asin)
-
-    if 'review_text' in df.columns:
-        df['review_text'] = df['review_text'].astype(str)
+        df['product_id'] = extract_first_asins(df['product_id'])
 
     if 'rating' in df.columns:
         df['rating'] = pd.to_numeric(df['rating'], errors='coerce')
 
     if 'review_date' in df.columns:
-        df['review_date'] = pd.to_datetime(df['review_date'], errors='coerce', utc=True)
-
-    if 'review_text' in df.columns:
-        df['review_len'] = df['review_text'].str.len()
-        df['review_word_count'] = df['review_text'].str.split().str.len()
+        df['review_date'] = _to_datetime_unique(df['review_date'])
 
     if 'review_text' in df.columns:
-        mask_valid_text = df['review_text'].notna() & (df['review_text'].str.strip() != '') & (df['review_text'].str.lower() != 'nan')
-        df = df[mask_valid_text].copy()
+        # nulos (NaN, None, pd.NA) são texto inválido qualquer que seja o leitor
+        missing = df['review_text'].isna().to_numpy()
+        text = df['review_text'].astype(str)
+        if _ARROW_AVAILABLE:
+            # string[pyarrow]: um buffer UTF-8 contíguo em vez de um objeto str por linha;
+            # _text_features usa o mesmo array Arrow sem converter de novo
+            text = text.astype('string[pyarrow]')
+        df['review_text'] = text
+        df['review_len'], df['review_word_count'], mask_valid_text = _text_features(text)
+        df = df[mask_valid_text & ~missing]
 
     if 'review_id' in df.columns:
         df = df.drop_duplicates(subset=['review_id'], keep='first')
     else:
         df = df.drop_duplicates()
 
-    df = df.reset_index(drop=True)
+    df = optimize_dtypes(df.reset_index(drop=True))
 
     print(f"[transform] saída com {len(df)} linhas e {len(df.columns)} colunas")
     return df
 
-def save_processed(df, out_path='../data/processed/reviews_clean.csv'):
-    """Salva DataFrame processado para CSV (cria pasta se necessário)."""
+# colunas de texto que se repetem muito (marca, categorias...): candidatas a category
+CATEGORY_COLUMNS = ('brand', 'primarycategories', 'categories', 'reviews_username', 'sentiment')
+# só vira category se tiver no máximo esta fração de valores distintos
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+def optimize_dtypes(df):
+    """
+    Reduz a memória do DataFrame (in-place, retorna o próprio df):
+    - colunas de CATEGORY_COLUMNS com poucos valores distintos -> category
+      (códigos inteiros + um dicionário, em vez de um objeto str por linha);
+    - rating, review_len e review_word_count inteiros -> menor tipo inteiro que comporta os valores.
+
+    rating com decimais/NaN continua float64: float32 mudaria os valores gravados no DB
+    (3.3 -> 3.2999999523). Os valores gravados no CSV/DB e devolvidos pela API não mudam.
+    """
+    for c in CATEGORY_COLUMNS:
+        if c in df.columns and df[c].dtype == object:
+            if df[c].nunique(dropna=True) <= CATEGORY_MAX_UNIQUE_RATIO * len(df):
+                df[c] = df[c].astype('category')
+    for c in ('rating', 'review_len', 'review_word_count'):
+        if c in df.columns and pd.api.types.is_integer_dtype(df[c]):
+            df[c] = pd.to_numeric(df[c], downcast='integer')
+    return df
+
+def write_processed(df, out_path):
+    """
+    Grava o DataFrame processado em out_path (cria a pasta se necessário).
+    Extensão .parquet: Parquet com zstd (tipos preservados, ~5x menor que o CSV);
+    qualquer outra: CSV.
+    """
     out_dir = os.path.dirname(out_path)
-    if out_dir and not os.path.exists(out_dir):
+    if out_dir:
         os.makedirs(out_dir, exist_ok=True)
-    df.to_csv(out_path, index=False)
+    if _is_parquet(out_path):
+        df.to_parquet(out_path, engine='pyarrow', compression='zstd', index=False)
+    else:
+        df.to_csv(out_path, index=False)
+    return out_path
+
+def save_processed(df, out_path='../data/processed/reviews_clean.csv'):
+    """Salva DataFrame processado para CSV ou Parquet, pela extensão (cria pasta se necessário)."""
+    write_processed(df, out_path)
     print(f"[save_processed] salvo {len(df)} linhas em {out_path}")
     return out_path
 
@@ -131,7 +341,7 @@ if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="ETL: extract, transform and save processed CSV")
     parser.add_argument("--source", required=True, help="caminho para CSV raw, ex: data/raw/reviews.csv")
-    parser.add_argument("--out", default="data/processed/reviews_clean.csv", help="output processed csv")
+    parser.add_argument("--out", default="data/processed/reviews_clean.csv", help="output processed csv (ou .parquet)")
     parser.add_argument("--nrows", type=int, default=None, help="usar apenas nrows (dev)")
     args = parser.parse_args()
     df_raw = extract(args.source, nrows=args.nrows)
@@ -3,49 +3,175 @@ Export utilities: consulta o DB e gera CSV pronto para Google Sheets / Looker St
 Uso:
     from src.export import export_for_dashboard
     export_for_dashboard('data/db/reviews.db', 'data/export/reviews_for_dashboard.csv')
+
+export_for_dashboard_streaming tem a mesma saída, mas lê o cursor do SQLite linha a
+linha direto para o CSV (memória constante, sem pandas); iter_dashboard_csv gera o
+mesmo conteúdo em pedaços para respostas HTTP em streaming.
+
+export_for_dashboard usa pandas em blocos; com backend='polars' (opt-in, requer
+`pip install polars`, fora do requirements.txt) lê e grava o CSV com polars
+(escrita multithread). A saída é a mesma.
 """
 
+import csv
+import io
 import os
 import sqlite3
 import pandas as pd
-from typing import Tuple
+from typing import Iterator, Tuple
+
+from src.pool import CACHE_SIZE_KB, MMAP_SIZE
+
+# polars é opcional: só usado com export_for_dashboard(backend='polars')
+try:
+    import polars as pl
+    _POLARS_AVAILABLE = True
+except ImportError:
+    pl = None
+    _POLARS_AVAILABLE = False
+
+PREFERRED_COLUMNS = [
+    "review_id", "product_id", "review_date", "rating", "sentiment", "keywords",
+    "review_len", "review_word_count", "reviews_username", "reviews_title",
+    "brand", "categories"
+]
+
+EXPORT_BATCH_ROWS = 5000
+# linhas por DataFrame em export_for_dashboard
+EXPORT_CHUNK_ROWS = 100_000
 
 def export_for_dashboard(db_path: str = 'data/db/reviews.db',
-                         out_path: str = 'data/export/reviews_for_dashboard.csv') -> Tuple[str, int]:
+                         out_path: str = 'data/export/reviews_for_dashboard.csv',
+                         chunk_rows: int = EXPORT_CHUNK_ROWS,
+                         backend: str = 'pandas') -> Tuple[str, int]:
     """
     Exporta dados da tabela 'reviews' do SQLite para CSV pronto para Google Sheets / Looker Studio.
 
     - Faz verificação de existência da tabela.
-    - Seleciona colunas relevantes apenas se existirem (evita KeyError).
+    - Seleciona colunas relevantes apenas se existirem (projeção feita no SQL).
     - Formata review_date como string ISO.
+    - backend: 'pandas' (padrão; lê e grava em blocos de chunk_rows linhas: memória
+      limitada ao bloco) ou 'polars' (review_date formatada no SQL, CSV escrito pelo
+      polars). O padrão não depende do que estiver instalado.
 
     Retorna (out_path, number_of_rows).
     """
+    if backend not in ('polars', 'pandas'):
+        raise ValueError(f"backend inválido: {backend!r} (use 'pandas' ou 'polars')")
+    if backend == 'polars' and not _POLARS_AVAILABLE:
+        raise RuntimeError("backend='polars' requer o pacote polars instalado")
+
     os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
 
     conn = sqlite3.connect(db_path)
     try:
-        tbls = pd.read_sql_query("SELECT name FROM sqlite_master WHERE type='table' AND name='reviews';", conn)
-        if tbls.empty:
-            raise RuntimeError(f"Tabela 'reviews' não encontrada no DB: {db_path}")
-        df = pd.read_sql_query("SELECT * FROM reviews", conn)
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+        if backend == 'polars':
+            rows = _export_polars(conn, db_path, out_path)
+        else:
+            rows = _export_pandas(conn, db_path, out_path, chunk_rows)
     finally:
         conn.close()
 
-    preferred = [
-        "review_id", "product_id", "review_date", "rating", "sentiment", "keywords",
-        "review_len", "review_word_count", "reviews_username", "reviews_title",
-        "brand", "categories"
-    ]
+    return out_path, rows
+
+def _export_polars(conn, db_path, out_path):
+    """CSV do export lido e gravado com polars (review_date já formatada pelo SQLite)."""
+    _, query = _export_select(conn, db_path)
+    # schema inferido de todas as linhas: colunas nulas no início não viram tipo Null
+    df = pl.read_database(query, connection=conn, infer_schema_length=None)
+    # o csv do Python escreve '' e NULL do mesmo jeito (campo vazio); o polars cita ''
+    df = df.with_columns(pl.col(pl.String).replace("", None))
+    df.write_csv(out_path)
+    return df.height
+
+def _export_pandas(conn, db_path, out_path, chunk_rows):
+    """CSV do export em blocos de chunk_rows linhas com pandas."""
+    rows = 0
+    _, query = _export_select(conn, db_path, format_date=False)
+    # sempre ao menos um bloco (vazio se a tabela não tem linhas): o cabeçalho é escrito.
+    # Tipos anuláveis: um INTEGER com NULL sai "5" em todos os blocos (não "5.0" só
+    # nos blocos que tiverem algum NULL)
+    chunks = pd.read_sql_query(query, conn, chunksize=chunk_rows, dtype_backend='numpy_nullable')
+    for i, chunk in enumerate(chunks):
+        if "review_date" in chunk.columns:
+            chunk["review_date"] = pd.to_datetime(chunk["review_date"], errors="coerce").dt.strftime('%Y-%m-%d %H:%M:%S')
+        chunk.to_csv(out_path, index=False, mode='w' if i == 0 else 'a', header=i == 0)
+        rows += len(chunk)
+    return rows
+
+def _export_select(conn, db_path, format_date=True):
+    """
+    Monta a projeção do export direto no SQL (colunas preferidas que existirem,
+    review_date formatada com strftime se format_date). Retorna (colunas, sql).
+    """
+    if not conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='reviews';").fetchone():
+        raise RuntimeError(f"Tabela 'reviews' não encontrada no DB: {db_path}")
+    table_cols = [r[1] for r in conn.execute("PRAGMA table_info(reviews)").fetchall()]
+
+    cols = [c for c in PREFERRED_COLUMNS if c in table_cols] or table_cols
+    select = ", ".join(
+        "strftime('%Y-%m-%d %H:%M:%S', review_date) AS review_date" if c == "review_date" and format_date else f'"{c}"'
+        for c in cols
+    )
+    return cols, f"SELECT {select} FROM reviews"
+
+def export_for_dashboard_streaming(db_path: str = 'data/db/reviews.db',
+                                   out_path: str = 'data/export/reviews_for_dashboard.csv') -> Tuple[str, int]:
+    """
+    Mesmo resultado de export_for_dashboard, sem materializar a tabela:
+    projeta as colunas e formata review_date no próprio SQL e escreve cada linha
+    do cursor no CSV em lotes (buffer de 1MB). Memória limitada ao lote, independente do nº de linhas.
+
+    Retorna (out_path, number_of_rows).
+    """
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
 
-    cols = [c for c in preferred if c in df.columns]
-    if not cols:
-        cols = df.columns.tolist()
+    conn = sqlite3.connect(db_path)
+    try:
+        cols, query = _export_select(conn, db_path)
 
-    df_export = df[cols].copy()
+        rows = 0
+        cur = conn.execute(query)
+        with open(out_path, 'w', buffering=1 << 20, newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(cols)
+            # lotes de linhas: uma chamada writerows por lote; o buffer de 1MB
+            # agrupa os write() no kernel
+            while True:
+                batch = cur.fetchmany(EXPORT_BATCH_ROWS)
+                if not batch:
+                    break
+                writer.writerows(batch)
+                rows += len(batch)
+    finally:
+        conn.close()
 
-    if "review_date" in df_export.columns:
-        df_export["review_date"] = pd.to_datetime(df_export["review_date"], errors="coerce").dt.strftime('%Y-%m-%d %H:%M:%S')
+    return out_path, rows
 
-    df_export.to_csv(out_path, index=False)
-    return out_path, len(df_export)
+def iter_dashboard_csv(db_path: str = 'data/db/reviews.db', batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[str]:
+    """
+    Gera o mesmo CSV de export_for_dashboard_streaming em pedaços de texto
+    (cabeçalho, depois um pedaço por lote de batch_rows linhas), para respostas HTTP
+    em streaming. Erros de DB/tabela são levantados no primeiro next().
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        cols, query = _export_select(conn, db_path)
+        cur = conn.execute(query)
+        cur.arraysize = batch_rows
+
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator='\n')
+        writer.writerow(cols)
+        while True:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+            batch = cur.fetchmany()
+            if not batch:
+                break
+            writer.writerows(batch)
+    finally:
+        conn.close()
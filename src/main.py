@@ -1,75 +1,211 @@
 import argparse
+import concurrent.futures
+import functools
+import hashlib
+import json
 import logging
 import os
-from src.etl import extract, transform
+from typing import Callable
+
+import pandas as pd
+
+from src import etl, nlp
+from src.etl import extract, transform, write_processed
 from src.nlp import apply_nlp
-from src.db import init_db, save_df
+from src.db import init_db, save_df, with_sentiment_code
 from src.export import export_for_dashboard
 
+DEFAULT_CACHE_DIR = 'data/cache'
+
+@functools.lru_cache(maxsize=1)
+def _code_version() -> str:
+    """Hash do código de etl.py e nlp.py: mudou a lógica, o cache antigo deixa de valer."""
+    h = hashlib.sha1()
+    for module in (etl, nlp):
+        with open(module.__file__, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+def _cache_paths(cache_dir: str, source: str, nrows: int | None):
+    """
+    (parquet, schema.json) do resultado de extract->transform->nlp para source/nrows.
+    A chave combina caminho, mtime e tamanho do arquivo, nrows, a versão do código e
+    os backends em uso (com/sem VADER, punkt, stopwords do NLTK o resultado muda).
+    O nome começa por um hash só do caminho: '<fonte>-<chave>', ver _prune_cached.
+    """
+    st = os.stat(source)
+    path = os.path.abspath(source)
+    backends = json.dumps({**etl.backend_state(), **nlp.backend_state()}, sort_keys=True)
+    raw = f"{path}:{st.st_mtime_ns}:{st.st_size}:{nrows}:{_code_version()}:{backends}"
+    source_key = hashlib.sha1(path.encode()).hexdigest()[:12]
+    key = hashlib.sha1(raw.encode()).hexdigest()[:16]
+    base = os.path.join(cache_dir, f"{source_key}-{key}")
+    return base + '.parquet', base + '.schema.json'
+
+def _prune_cached(path: str) -> None:
+    """
+    Apaga as outras entradas da mesma fonte (outro mtime, nrows, versão do código...):
+    fica uma entrada por arquivo de entrada, em vez de um snapshot a cada mudança.
+    Arquivos .tmp de gravações em andamento são preservados.
+    """
+    cache_dir, name = os.path.split(path)
+    prefix = name.split('-', 1)[0] + '-'
+    current = name[:-len('.parquet')] + '.'
+    for entry in os.listdir(cache_dir or '.'):
+        if entry.startswith(prefix) and not entry.startswith(current) and not entry.endswith('.tmp'):
+            try:
+                os.remove(os.path.join(cache_dir, entry))
+            except OSError:
+                pass
+
+def _dtype_name(dtype) -> str:
+    """Nome do dtype que o astype aceita de volta (StringDtype inclui o storage: 'string[pyarrow]')."""
+    if isinstance(dtype, pd.StringDtype):
+        return f"string[{dtype.storage}]"
+    return str(dtype)
+
+def _load_cached(path: str, schema_path: str):
+    """
+    DataFrame do cache, ou None se não existe ou não pode ser lido. Os dtypes que o
+    Parquet não preserva (ex.: string[pyarrow] volta como string[python]) são
+    restaurados a partir do schema gravado ao lado.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        df = pd.read_parquet(path, engine='pyarrow')
+        with open(schema_path, encoding='utf-8') as f:
+            schema = json.load(f)
+        changed = {c: t for c, t in schema.items() if c in df.columns and _dtype_name(df[c].dtype) != t}
+        return df.astype(changed) if changed else df
+    except Exception as e:
+        logging.getLogger(__name__).warning("Cache ilegível em %s (%s); reprocessando", path, e)
+        return None
+
+def _store_cached(df, path: str, schema_path: str) -> None:
+    """Grava o Parquet (via arquivo temporário + rename: leitores nunca veem um arquivo pela metade) e o schema."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp, engine='pyarrow', compression='zstd', index=False)
+    os.replace(tmp, path)
+    with open(schema_path, 'w', encoding='utf-8') as f:
+        json.dump({c: _dtype_name(t) for c, t in df.dtypes.items()}, f)
+    _prune_cached(path)
+
 def run_pipeline(source: str,
                  out: str | None = None,
                  to_db: bool = False,
                  db_path: str = 'data/db/reviews.db',
                  nrows: int | None = None,
-                 log_level: str = 'INFO') -> object:
+                 log_level: str = 'INFO',
+                 progress: Callable[[str, int], None] | None = None,
+                 cache_dir: str | None = DEFAULT_CACHE_DIR) -> object:
     """
-    Executa pipeline: extract -> transform -> nlp -> (save processed CSV) -> (save to db)
+    Executa pipeline: extract -> transform -> nlp -> (save processed CSV | save to db, em paralelo)
     Retorna o DataFrame processado.
+
+    progress (opcional) é chamado como progress(etapa, percentual) no início de cada etapa
+    e com ('done', 100) ao final; usado pela API para reportar o andamento do job.
+
+    cache_dir: o resultado de extract->transform->nlp é guardado em Parquet nesta pasta;
+    rodar de novo com o mesmo arquivo (mesmo mtime/tamanho), nrows e código pula essas
+    etapas. None desativa o cache (requer pyarrow; sem ele, o cache é ignorado).
     """
+    report = progress or (lambda stage, pct: None)
     numeric_level = getattr(logging, log_level.upper(), logging.INFO)
     logging.basicConfig(level=numeric_level, format='%(levelname)s: %(message)s')
     logger = logging.getLogger(__name__)
     logger.info("Running pipeline")
 
-    logger.info("[extract] lendo CSV")
-    df = extract(source, nrows=nrows)
+    cache_path = schema_path = None
+    # fonte inexistente: sem cache, extract reporta o erro
+    if cache_dir and etl.backend_state()['pyarrow'] and os.path.isfile(source):
+        cache_path, schema_path = _cache_paths(cache_dir, source, nrows)
 
-    logger.info("[transform] aplicando transformações")
-    df = transform(df)
+    report("extract", 0)
+    df = _load_cached(cache_path, schema_path) if cache_path else None
+    if df is not None:
+        logger.info(f"[cache] usando resultado processado em {cache_path}")
+    else:
+        logger.info("[extract] lendo CSV")
+        df = extract(source, nrows=nrows)
 
-    logger.info("Applying NLP (clean_text, sentiment, keywords)...")
-    df = apply_nlp(df)
+        report("transform", 20)
+        logger.info("[transform] aplicando transformações")
+        df = transform(df)
 
-    if out:
-        os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
-        logger.info(f"[save_processed] salvando CSV em {out}")
-        df.to_csv(out, index=False)
-    else:
-        logger.debug("Argumento --out não fornecido; pulando salvamento de CSV processado.")
+        report("nlp", 30)
+        logger.info("Applying NLP (clean_text, sentiment, keywords)...")
+        df = apply_nlp(df)
 
-    if to_db:
+        if cache_path:
+            try:
+                _store_cached(df, cache_path, schema_path)
+            except Exception as e:
+                logger.warning("Não foi possível gravar o cache em %s: %s", cache_path, e)
+
+    def save_processed():
+        report("save_processed", 70)
+        logger.info(f"[save_processed] salvando em {out}")
+        write_processed(df, out)
+
+    def save_db():
+        report("save_db", 80)
         logger.info(f"Initializing DB and saving to SQLite: {db_path}")
         engine = init_db(db_path)
-        save_df(engine, df, table_name='reviews')
+        save_df(engine, with_sentiment_code(df), table_name='reviews')
         logger.info(f"Saved {len(df)} rows to DB")
 
+    if not out:
+        logger.debug("Argumento --out não fornecido; pulando salvamento de CSV processado.")
+    sinks = [fn for fn, enabled in ((save_processed, out), (save_db, to_db)) if enabled]
+    if len(sinks) > 1:
+        # arquivo processado e DB só leem o df: gravam em paralelo (a escrita do
+        # Parquet e o sqlite3 liberam o GIL durante o I/O)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(sinks)) as ex:
+            for future in [ex.submit(fn) for fn in sinks]:
+                future.result()
+    else:
+        for fn in sinks:
+            fn()
+
+    report("done", 100)
     logger.info("Pipeline finished. Processed rows: %d", len(df))
     return df
 
 def main():
     parser = argparse.ArgumentParser(description="Run ETL + NLP pipeline")
     parser.add_argument('--source', required=True, help='Path to input CSV')
-    parser.add_argument('--out', required=False, help='Path to output CSV (optional)')
+    parser.add_argument('--out', required=False, help='Path to output CSV or .parquet (optional)')
     parser.add_argument('--to-db', action='store_true', help='Save results to SQLite')
     parser.add_argument('--db', dest='db_path', default='data/db/reviews.db', help='SQLite DB path')
     parser.add_argument('--nrows', type=int, default=None, help='Number of rows to process (for testing)')
     parser.add_argument('--log-level', default='INFO', help='Logging level (DEBUG, INFO, WARNING, ERROR)')
     parser.add_argument('--export', action='store_true', help='After saving to DB, export CSV for dashboard (reads DB)')
+    parser.add_argument('--export-backend', choices=('pandas', 'polars'), default='pandas',
+                        help='Backend for --export (polars requires `pip install polars`)')
+    parser.add_argument('--download-nltk', action='store_true',
+                        help='Download missing NLTK data (punkt, stopwords, vader_lexicon) before running')
+    parser.add_argument('--no-cache', action='store_true', help=f'Ignore/skip the processed cache in {DEFAULT_CACHE_DIR}')
 
     args = parser.parse_args()
 
+    if args.download_nltk:
+        nlp.ensure_nltk_data()
+
     df = run_pipeline(source=args.source,
                       out=args.out,
                       to_db=args.to_db,
                       db_path=args.db_path,
                       nrows=args.nrows,
-                      log_level=args.log_level)
+                      log_level=args.log_level,
+                      cache_dir=None if args.no_cache else DEFAULT_CACHE_DIR)
 
     if args.export:
         if not args.to_db:
             logging.warning("--export solicitado mas --to-db não foi passado; export irá tentar ler DB existente.")
         try:
-            csv_path, rows = export_for_dashboard(db_path=args.db_path)
+            csv_path, rows = export_for_dashboard(db_path=args.db_path, backend=args.export_backend)
             logging.info(f"Exported {rows} rows to {csv_path}")
         except Exception as e:
             logging.error("Falha ao exportar para dashboard: %s", e)
@@ -7,6 +7,8 @@ is not available.
 
 Exports:
 - clean_text(text)
+- clean_text_series(series)
+- ensure_nltk_data()  -> opt-in download of the NLTK data used here
 - tokenize_and_remove_stopwords(text)
 - sentiment_vader(text)  -> returns 'positive'|'negative'|'neutral'
 - top_keywords(text, n=5)
@@ -14,11 +16,16 @@ Exports:
 """
 from __future__ import annotations
 
+import functools
+import os
 import re
+import string
+import sys
 import warnings
 from collections import Counter
 from typing import List
 
+import numpy as np
 import pandas as pd
 
 # Try importing nltk components; if unavailable, fall back to lightweight alternatives
@@ -36,59 +43,161 @@ except Exception:
     stopwords = None  # type: ignore
     SentimentIntensityAnalyzer = None  # type: ignore
 
-# Prepare stopwords set (safe fallback)
-if _NLTK_AVAILABLE:
-    try:
-        _stopset = set(w.lower() for w in stopwords.words("english"))
-    except Exception:
-        # If stopwords not present, don't attempt to download automatically.
-        # Use a small built-in fallback list.
-        warnings.warn("NLTK stopwords not available — using small built-in stoplist")
-        _stopset = {
-            "the",
-            "and",
-            "is",
-            "in",
-            "it",
-            "of",
-            "to",
-            "a",
-            "i",
-            "this",
-            "that",
-            "for",
-            "on",
-            "with",
-        }
-else:
-    _stopset = {
-        "the",
-        "and",
-        "is",
-        "in",
-        "it",
-        "of",
-        "to",
-        "a",
-        "i",
-        "this",
-        "that",
-        "for",
-        "on",
-        "with",
-    }
+# pyarrow is optional: with it, batch string cleaning runs on Arrow's regex kernels
+try:
+    import pyarrow  # type: ignore  # noqa: F401
 
-STOPWORDS = set(w.lower() for w in _stopset)
+    _ARROW_AVAILABLE = True
+except Exception:
+    _ARROW_AVAILABLE = False
 
-# Initialize sentiment analyzer if available. Do NOT call nltk.download() here
-# to avoid concurrency / permission issues in cloud environments.
-_sia = None
-if _NLTK_AVAILABLE and SentimentIntensityAnalyzer is not None:
+# joblib (installed with scikit-learn) parallelizes apply_nlp across processes
+try:
+    from joblib import Parallel, delayed  # type: ignore
+
+    _JOBLIB_AVAILABLE = True
+except Exception:
+    Parallel = None  # type: ignore
+    delayed = None  # type: ignore
+    _JOBLIB_AVAILABLE = False
+
+# the values of the 'sentiment' column (a categorical with these categories)
+SENTIMENT_LABELS = ("negative", "neutral", "positive")
+
+# below this many distinct texts, process startup costs more than it saves
+PARALLEL_MIN_TEXTS = 5000
+# batches per worker: review lengths vary a lot, so smaller batches keep workers busy
+# until the end instead of waiting on the one that drew the longest texts
+PARALLEL_BATCHES_PER_JOB = 4
+
+# per-process memo of sentiment / keywords by text: short reviews ("Great!", "Love it")
+# repeat across batches and across pipeline runs in the same worker process
+NLP_CACHE_SIZE = 65536
+
+# apply_nlp works through the frame in blocks of this many rows, so the per-text
+# temporaries (coerced texts, distinct texts, result lists) stay bounded by one block
+NLP_CHUNK_ROWS = 50_000
+
+# Small built-in stoplist used when the NLTK stopwords corpus is missing
+_FALLBACK_STOPWORDS = {
+    "the",
+    "and",
+    "is",
+    "in",
+    "it",
+    "of",
+    "to",
+    "a",
+    "i",
+    "this",
+    "that",
+    "for",
+    "on",
+    "with",
+}
+
+
+def _load_stopwords() -> frozenset:
+    """NLTK English stopwords, or the built-in fallback. Never downloads."""
+    if _NLTK_AVAILABLE:
+        try:
+            return frozenset(w.lower() for w in stopwords.words("english"))
+        except Exception:
+            # If stopwords not present, don't attempt to download automatically.
+            warnings.warn("NLTK stopwords not available — using small built-in stoplist")
+    return frozenset(_FALLBACK_STOPWORDS)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_sia():
+    """
+    The process-wide VADER analyzer, or None. Built on the first sentiment call, not
+    at import: loading the lexicon is wasted work for callers that only clean text or
+    extract keywords. Do NOT call nltk.download() here to avoid concurrency /
+    permission issues in cloud environments; see ensure_nltk_data().
+    """
+    if not (_NLTK_AVAILABLE and SentimentIntensityAnalyzer is not None):
+        return None
     try:
-        _sia = SentimentIntensityAnalyzer()
+        return SentimentIntensityAnalyzer()
     except Exception as e:
         warnings.warn(f"VADER unavailable; falling back to simple sentiment: {e}")
-        _sia = None
+        return None
+
+
+def _check_word_tokenize() -> bool:
+    """
+    Whether word_tokenize has its punkt data. Checked once: without the data every
+    call raises LookupError after searching all nltk.data paths (~100x slower than
+    the regex fallback it ends up using anyway).
+    """
+    if not (_NLTK_AVAILABLE and word_tokenize is not None):
+        return False
+    try:
+        word_tokenize("ok")
+        return True
+    except Exception:
+        return False
+
+
+STOPWORDS = _load_stopwords()
+_WORD_TOKENIZE_OK = _check_word_tokenize()
+
+# NLTK data used by this module (punkt_tab is what recent NLTK versions load for word_tokenize)
+NLTK_PACKAGES = ("punkt", "punkt_tab", "stopwords", "vader_lexicon")
+
+
+def ensure_nltk_data(packages=NLTK_PACKAGES, quiet: bool = True) -> bool:
+    """
+    Download any missing NLTK data (opt-in: call it once, e.g. from the CLI with
+    --download-nltk, never at import) and reload the stopwords, the shared VADER
+    analyzer and the tokenizer check. Returns True if VADER is usable afterwards.
+    """
+    global STOPWORDS, _WORD_TOKENIZE_OK
+    if not _NLTK_AVAILABLE:
+        return False
+    for pkg in packages:
+        try:
+            nltk.download(pkg, quiet=quiet)
+        except Exception as e:
+            warnings.warn(f"Could not download NLTK package {pkg!r}: {e}")
+    STOPWORDS = _load_stopwords()
+    _get_sia.cache_clear()
+    _WORD_TOKENIZE_OK = _check_word_tokenize()
+    # memoized results were computed with the previous analyzer / stopwords
+    _sentiment_label.cache_clear()
+    _top_keywords_clean.cache_clear()
+    return _get_sia() is not None
+
+
+# where SentimentIntensityAnalyzer() loads its lexicon from by default
+_VADER_LEXICON = "sentiment/vader_lexicon.zip/vader_lexicon/vader_lexicon.txt"
+
+
+def _vader_lexicon_available() -> bool:
+    if _get_sia.cache_info().currsize:
+        return _get_sia() is not None
+    if not (_NLTK_AVAILABLE and SentimentIntensityAnalyzer is not None):
+        return False
+    try:
+        nltk.data.find(_VADER_LEXICON)
+        return True
+    except LookupError:
+        return False
+
+
+def backend_state() -> dict:
+    """
+    Which optional backends this module's output depends on: VADER lexicon, punkt
+    (word_tokenize) and NLTK stopwords. Cheap: looks the lexicon up on the NLTK data
+    path instead of building the analyzer, so callers keying caches on it don't pay
+    for loading VADER.
+    """
+    return {
+        "vader": _vader_lexicon_available(),
+        "word_tokenize": _WORD_TOKENIZE_OK,
+        "nltk_stopwords": STOPWORDS != frozenset(_FALLBACK_STOPWORDS),
+    }
 
 # Simple fallback lexicons (used when VADER unavailable)
 _POSITIVE_LEX = {
@@ -126,6 +235,43 @@ _NEUTRAL_PHRASE_PATTERNS = [
 ]
 _NEUTRAL_PHRA_RE = re.compile("|".join(_NEUTRAL_PHRASE_PATTERNS), flags=re.IGNORECASE)
 
+# Patterns compiled once at import (the per-text functions run once per distinct review)
+_TAG_RE = re.compile(r"<.*?>")
+_NON_ALPHA_RE = re.compile(r"[^A-Za-z\s]")
+_WS_RE = re.compile(r"\s+")
+_TOKEN_RE = re.compile(r"[A-Za-z]+")
+# ASCII letters and whitespace stay, every other ASCII char becomes a space (clean_text fast path)
+_ASCII_CLEAN_TABLE = str.maketrans(
+    {c: " " for c in map(chr, range(128)) if not (c.isalpha() or c.isspace())}
+)
+_MODERATE_RE = re.compile(r"\b(?:okay|ok|fine|alright)\b", flags=re.IGNORECASE)
+
+
+def _word_alternation(words) -> "re.Pattern[str]":
+    """One regex matching any of the whole words (longest first), instead of one search per word."""
+    alternation = "|".join(map(re.escape, sorted(words, key=len, reverse=True)))
+    return re.compile(rf"\b(?:{alternation})\b")
+
+
+_POSITIVE_RE = _word_alternation(_POSITIVE_LEX)
+_NEGATIVE_RE = _word_alternation(_NEGATIVE_LEX)
+
+# VADER input guards: some VADER versions get drastically slower (seconds per text)
+# on long runs of emoticons/symbols, so one adversarial review could stall a batch
+VADER_MAX_CHARS = 2000
+# above this share of symbols (not letters/digits/whitespace) use the lexicon fallback;
+# only checked past VADER_SYMBOL_CHECK_MIN_CHARS so short emoticon reviews (":)") keep VADER
+VADER_MAX_SYMBOL_RATIO = 0.4
+VADER_SYMBOL_CHECK_MIN_CHARS = 100
+_SYMBOL_RE = re.compile(r"[^\w\s]|_")
+# runs of 5+ identical chars shrink to 4 without changing VADER's score: its '!' and
+# '?' emphasis saturate at 4 marks, and no PUNC_LIST entry, lexicon word or booster
+# has a run longer than 3, so a token with a 4-run matches exactly what a longer one did
+CHAR_RUN_KEEP = 4
+_CHAR_RUN_RE = re.compile(r"(.)\1{%d,}" % CHAR_RUN_KEEP)
+# the punctuation VADER strips when matching tokens to words (its REGEX_REMOVE_PUNCTUATION)
+_PUNCT_RE = re.compile(f"[{re.escape(string.punctuation)}]")
+
 
 def clean_text(text: str) -> str:
     """
@@ -133,18 +279,41 @@ def clean_text(text: str) -> str:
     """
     if not text:
         return ""
-    s = str(text)
-    s = re.sub(r"<.*?>", " ", s)  # strip simple HTML tags
-    s = re.sub(r"[^A-Za-z\s]", " ", s)  # keep letters and spaces
-    s = re.sub(r"\s+", " ", s).strip()
-    return s.lower()
+    s = text if isinstance(text, str) else str(text)
+    if "<" in s:
+        s = _TAG_RE.sub(" ", s)  # strip simple HTML tags
+    if s.isascii():
+        # one C-level translate pass; split() collapses and strips whitespace
+        return " ".join(s.translate(_ASCII_CLEAN_TABLE).split()).lower()
+    s = _NON_ALPHA_RE.sub(" ", s)  # keep letters and spaces (non-ASCII letters are dropped too)
+    return _WS_RE.sub(" ", s).strip().lower()
+
+
+def clean_text_series(texts: pd.Series) -> pd.Series:
+    """
+    clean_text over a whole Series of strings (no nulls). With pyarrow, runs the same
+    substitutions as one vectorized pass per step on a string[pyarrow] array; the
+    results are identical (every non-letter becomes a space before whitespace is
+    collapsed, so RE2's ASCII-only \\s does not matter). Without pyarrow, maps clean_text.
+    """
+    if not _ARROW_AVAILABLE:
+        return texts.map(clean_text)
+    s = texts.astype("string[pyarrow]")
+    s = (
+        s.str.replace(_TAG_RE.pattern, " ", regex=True)
+        .str.replace(_NON_ALPHA_RE.pattern, " ", regex=True)
+        .str.replace(_WS_RE.pattern, " ", regex=True)
+        .str.strip()
+        .str.lower()
+    )
+    return s.astype(object)
 
 
 def _simple_tokenize(text: str) -> List[str]:
     """Lightweight tokenizer used as fallback."""
     if not text:
         return []
-    return re.findall(r"[A-Za-z]+", text)
+    return _TOKEN_RE.findall(text)
 
 
 def tokenize_and_remove_stopwords(text: str) -> List[str]:
@@ -154,17 +323,43 @@ def tokenize_and_remove_stopwords(text: str) -> List[str]:
     """
     if not text:
         return []
-    if _NLTK_AVAILABLE and word_tokenize is not None:
+    # tokenizing and stopword filtering in one comprehension (one list, one pass)
+    if _WORD_TOKENIZE_OK:
         try:
-            toks = word_tokenize(text)
-            toks = [t.lower() for t in toks if t.isalpha()]
+            return [w for t in word_tokenize(text) if t.isalpha() and (w := t.lower()) not in STOPWORDS]
         except Exception:
-            toks = _simple_tokenize(text)
-    else:
-        toks = _simple_tokenize(text)
+            pass
+    return [t for t in _TOKEN_RE.findall(text) if t not in STOPWORDS]
+
+
+# words the Treebank tokenizer splits even without apostrophes (its CONTRACTIONS2)
+_TREEBANK_SPLITS = {
+    "cannot": ("can", "not"),
+    "gimme": ("gim", "me"),
+    "gonna": ("gon", "na"),
+    "gotta": ("got", "ta"),
+    "lemme": ("lem", "me"),
+    "wanna": ("wan", "na"),
+}
 
-    toks = [t for t in toks if t not in STOPWORDS]
-    return toks
+
+def _tokens_from_clean(cleaned: str) -> List[str]:
+    """
+    Tokens of a clean_text result, minus stopwords. The text is already lowercase
+    ASCII letters separated by single spaces, so split() gives the words directly
+    (no Punkt/Treebank pass, which is much slower). The only words Treebank would
+    still split are in _TREEBANK_SPLITS; splitting them here keeps the tokens the
+    same with or without the punkt data.
+    """
+    tokens = []
+    for t in cleaned.split():
+        parts = _TREEBANK_SPLITS.get(t)
+        if parts is None:
+            if t not in STOPWORDS:
+                tokens.append(t)
+        else:
+            tokens.extend(p for p in parts if p not in STOPWORDS)
+    return tokens
 
 
 def sentiment_vader(text: str) -> str:
@@ -177,20 +372,30 @@ def sentiment_vader(text: str) -> str:
       plus a small heuristic to treat mild positives containing 'ok/okay/fine' as neutral.
     - If VADER is not available, use a very simple lexicon count fallback.
     """
-    if not text or not str(text).strip():
+    if not text:
         return "neutral"
+    # one coercion and one strip (apply_nlp already passes str)
+    stripped = (text if isinstance(text, str) else str(text)).strip()
+    # empty and single-char texts are neutral on every path (VADER skips 1-char tokens),
+    # so they skip the cache lookup; two chars can already score (":)", "<3")
+    if len(stripped) < 2:
+        return "neutral"
+    return _sentiment_label(stripped)
 
-    text_str = str(text).strip()
 
+@functools.lru_cache(maxsize=NLP_CACHE_SIZE)
+def _sentiment_label(text_str: str) -> str:
+    """sentiment_vader for a non-empty stripped string (memoized: a pure function of the text)."""
     # explicit neutral short-phrases
     if _NEUTRAL_PHRA_RE.match(text_str):
         return "neutral"
 
-    # use VADER if initialized
-    if _sia is not None:
+    # use VADER if initialized (and the text is not mostly symbols)
+    vader_text = text_str[:VADER_MAX_CHARS]
+    sia = _get_sia()
+    if sia is not None and not _symbol_heavy(vader_text):
         try:
-            scores = _sia.polarity_scores(text_str)
-            compound = float(scores.get("compound", 0.0))
+            compound = _vader_compound(sia, _CHAR_RUN_RE.sub(r"\1" * CHAR_RUN_KEEP, vader_text))
         except Exception:
             compound = 0.0
 
@@ -199,10 +404,7 @@ def sentiment_vader(text: str) -> str:
             return "neutral"
 
         if compound > 0.05:
-            lower = text_str.lower()
-            moderate_tokens = ["okay", "ok", "fine", "alright"]
-            contains_moderate = any(re.search(rf"\b{re.escape(t)}\b", lower) for t in moderate_tokens)
-            if contains_moderate and compound < 0.20:
+            if compound < 0.20 and _MODERATE_RE.search(text_str):
                 return "neutral"
             return "positive"
 
@@ -211,10 +413,97 @@ def sentiment_vader(text: str) -> str:
 
         return "neutral"
 
-    # fallback simple lexicon approach
+    return _lexicon_sentiment(text_str)
+
+
+class _SentiText:
+    """The two attributes of VADER's SentiText that its valence rules read."""
+
+    __slots__ = ("words_and_emoticons", "is_cap_diff")
+
+    def __init__(self, words_and_emoticons: List[str], is_cap_diff: bool):
+        self.words_and_emoticons = words_and_emoticons
+        self.is_cap_diff = is_cap_diff
+
+
+def _vader_tokens(text: str, punc_set: frozenset) -> List[str]:
+    """
+    VADER's SentiText tokens: words longer than one char, minus one leading or
+    trailing PUNC_LIST run when the rest is a word of the punctuation-free text.
+    SentiText finds these through a dict of every PUNC_LIST x word combination;
+    stripping each token and checking the set gives the same tokens in linear time.
+    """
+    words_only = {w for w in _PUNCT_RE.sub("", text).split() if len(w) > 1}
+    tokens = []
+    for we in text.split():
+        if len(we) <= 1:
+            continue
+        core = we.rstrip(string.punctuation)
+        if core == we:
+            core = we.lstrip(string.punctuation)
+        if core != we and we.replace(core, "", 1) in punc_set and core in words_only:
+            we = core
+        tokens.append(we)
+    return tokens
+
+
+@functools.lru_cache(maxsize=1)
+def _vader_punc_set(sia) -> frozenset:
+    return frozenset(sia.constants.PUNC_LIST)
+
+
+def _vader_compound(sia, text: str) -> float:
+    """
+    VADER's compound score, as in sia.polarity_scores(text)["compound"].
+
+    Two thirds of polarity_scores goes to tokenizing (see _vader_tokens); the
+    valence rules and the final score still run through the analyzer's own methods.
+    Those methods (_but_check included) are NLTK internals, so any analyzer whose
+    attributes or signatures differ falls back to polarity_scores.
+    """
+    try:
+        return _vader_compound_fast(sia, text)
+    except (AttributeError, TypeError):
+        return float(sia.polarity_scores(text).get("compound", 0.0))
+
+
+def _vader_compound_fast(sia, text: str) -> float:
+    """polarity_scores' compound with _vader_tokens in place of SentiText (NLTK 3.9 internals)."""
+    punc_set = _vader_punc_set(sia)
+    booster = sia.constants.BOOSTER_DICT
+    sentiment_valence, but_check, score_valence = (
+        sia.sentiment_valence, sia._but_check, sia.score_valence)
+
+    words = _vader_tokens(text, punc_set)
+    allcaps = sum(1 for w in words if w.isupper())
+    sentitext = _SentiText(words, 0 < len(words) - allcaps < len(words))
+
+    # same loop as polarity_scores (including its words.index(item) lookup)
+    sentiments = []
+    for item in words:
+        i = words.index(item)
+        lowered = item.lower()
+        if (i < len(words) - 1 and lowered == "kind" and words[i + 1].lower() == "of") or lowered in booster:
+            sentiments.append(0)
+            continue
+        sentiments = sentiment_valence(0, sentitext, item, i, sentiments)
+    sentiments = but_check(words, sentiments)
+    return float(score_valence(sentiments, text).get("compound", 0.0))
+
+
+def _symbol_heavy(text_str: str) -> bool:
+    """True for long texts where more than VADER_MAX_SYMBOL_RATIO is symbols (emoticon floods etc.)."""
+    if len(text_str) < VADER_SYMBOL_CHECK_MIN_CHARS:
+        return False
+    return len(_SYMBOL_RE.findall(text_str)) > VADER_MAX_SYMBOL_RATIO * len(text_str)
+
+
+def _lexicon_sentiment(text_str: str) -> str:
+    """Simple lexicon count fallback (used when VADER is unavailable or skipped)."""
     txt = text_str.lower()
-    pos_count = sum(1 for w in _POSITIVE_LEX if re.search(rf"\b{re.escape(w)}\b", txt))
-    neg_count = sum(1 for w in _NEGATIVE_LEX if re.search(rf"\b{re.escape(w)}\b", txt))
+    # one scan per lexicon; each distinct word counts once, as before
+    pos_count = len(set(_POSITIVE_RE.findall(txt)))
+    neg_count = len(set(_NEGATIVE_RE.findall(txt)))
 
     if pos_count == neg_count:
         return "neutral"
@@ -224,35 +513,114 @@ def sentiment_vader(text: str) -> str:
 def top_keywords(text: str, n: int = 5) -> str:
     """
     Return the top-n keywords as a comma-separated string.
-    Uses tokenize_and_remove_stopwords + simple frequency count.
+    Cleans the text once, then counts its non-stopword tokens (see _top_keywords_clean).
     """
     if not text:
         return ""
-    cleaned = clean_text(text)
-    toks = tokenize_and_remove_stopwords(cleaned)
+    return _top_keywords_clean(clean_text(text), n)
+
+
+@functools.lru_cache(maxsize=NLP_CACHE_SIZE)
+def _top_keywords_clean(cleaned: str, n: int = 5) -> str:
+    """top_keywords for text already passed through clean_text (skips cleaning it again)."""
+    toks = _tokens_from_clean(cleaned)
     if not toks:
         return ""
+    # Counter counts in C; most_common keeps first-seen order on ties
     counts = Counter(toks)
     most = [w for w, _ in counts.most_common(n)]
-    return ",".join(most)
-
-
-def apply_nlp(df: pd.DataFrame, text_column: str = "review_text") -> pd.DataFrame:
+    # different reviews often share a keyword bag ("great,product"): keep one str for all
+    return sys.intern(",".join(most))
+
+
+def _nlp_batch(texts: List[str]):
+    """(clean_text, sentiment, keywords) lists for a batch of texts; runs in joblib workers."""
+    # Arrow-backed input (string[pyarrow] uniques) is cleaned without converting it back and forth
+    s = pd.Series(texts) if isinstance(texts, pd.api.extensions.ExtensionArray) else pd.Series(texts, dtype=object)
+    cleaned = clean_text_series(s).tolist()
+    sentiments = []
+    keywords = []
+    # one pass per text for the per-row work: VADER reads the raw text (it scores
+    # punctuation and caps), keywords reuse the cleaned text instead of cleaning again
+    for raw, c in zip(texts, cleaned):
+        sentiments.append(sentiment_vader(raw))
+        keywords.append(_top_keywords_clean(c, n=5))
+    return cleaned, sentiments, keywords
+
+
+def _available_cpus() -> int:
+    """CPUs this process may run on (cgroup/affinity-aware where supported), at least 1."""
+    try:
+        return len(os.sched_getaffinity(0)) or 1
+    except AttributeError:  # not available on macOS / Windows
+        return os.cpu_count() or 1
+
+
+def _nlp_distinct(texts, n_jobs: int):
+    """_nlp_batch over distinct texts, split across joblib workers when worth it."""
+    if _JOBLIB_AVAILABLE and n_jobs > 1 and len(texts) >= PARALLEL_MIN_TEXTS:
+        n_batches = min(len(texts), n_jobs * PARALLEL_BATCHES_PER_JOB)
+        chunks = [c.tolist() for c in np.array_split(texts, n_batches)]
+        parts = Parallel(n_jobs=n_jobs, backend="loky")(delayed(_nlp_batch)(c) for c in chunks)
+        return [[v for part in parts for v in part[i]] for i in range(3)]
+    return _nlp_batch(texts)
+
+
+def apply_nlp(
+    df: pd.DataFrame,
+    text_column: str = "review_text",
+    n_jobs: int | None = None,
+    chunk_size: int | None = NLP_CHUNK_ROWS,
+) -> pd.DataFrame:
     """
     Apply NLP transforms to a pandas DataFrame:
       - adds 'clean_text'
-      - adds 'sentiment' (positive/neutral/negative)
+      - adds 'sentiment' (categorical: negative/neutral/positive)
       - adds 'keywords' (comma-separated top tokens)
-    Returns a copy of the dataframe with the new columns.
+    Returns a new dataframe with the new columns; the input frame is not modified
+    (its existing columns are shared, not copied).
+
+    n_jobs: worker processes for the per-text work (default: the CPUs available to
+    this process). Only used with joblib installed and at least PARALLEL_MIN_TEXTS
+    distinct texts in a block; each worker imports this module once and builds its
+    own VADER analyzer, then takes batches of texts until all are done.
+
+    chunk_size: rows per block (None: the whole frame in one block). Results are
+    written into the output columns block by block; a text repeated across blocks
+    is usually answered by the per-process caches.
     """
-    df = df.copy()
+    # shallow copy: adding columns never touches the caller's frame, and no column data is copied
+    df = df.copy(deep=False)
     if text_column not in df.columns:
         df[text_column] = ""
 
-    # ensure we operate on strings
-    src = df[text_column].fillna("").astype(str)
-
-    df["clean_text"] = src.map(clean_text)
-    df["sentiment"] = src.map(sentiment_vader)
-    df["keywords"] = src.map(lambda t: top_keywords(t, n=5))
+    n_rows = len(df)
+    step = chunk_size or max(n_rows, 1)
+    n_jobs = n_jobs or _available_cpus()
+    clean_out = np.empty(n_rows, dtype=object)
+    keywords_out = np.empty(n_rows, dtype=object)
+    sentiment_codes = np.empty(n_rows, dtype=np.int8)
+
+    column = df[text_column]
+    for start in range(0, n_rows, step):
+        stop = min(start + step, n_rows)
+        # ensure we operate on strings (string dtypes already are: skip the object round trip)
+        src = column.iloc[start:stop]
+        if isinstance(src.dtype, pd.StringDtype):
+            src = src.fillna("")
+        else:
+            src = src.fillna("").astype(str)
+
+        # duplicated reviews (empty, "Great!", reposts) are processed once: every
+        # function runs on the distinct raw texts and is spread back by code
+        codes, uniq = pd.factorize(src)
+        clean, sents, keywords = _nlp_distinct(uniq, n_jobs)
+        clean_out[start:stop] = np.array(clean, dtype=object).take(codes)
+        keywords_out[start:stop] = np.array(keywords, dtype=object).take(codes)
+        sentiment_codes[start:stop] = pd.Categorical(sents, categories=SENTIMENT_LABELS).codes.take(codes)
+
+    df["clean_text"] = clean_out
+    # three labels: a categorical keeps one int8 code per row instead of a str object each
+    df["sentiment"] = pd.Categorical.from_codes(sentiment_codes, categories=SENTIMENT_LABELS)
+    df["keywords"] = keywords_out
     return df
@@ -0,0 +1,165 @@
+"""
+Pool de conexões SQLite para a API.
+
+Cada arquivo de DB tem um pool com até `size` conexões somente-leitura (`mode=ro`),
+abertas sob demanda e devolvidas à fila após o uso. Só o pool do DB do próprio app
+(writable=True) abre também uma conexão de escrita (na criação: ativa WAL e fica
+aberta para manter o -wal/-shm); com WAL, leitores concorrentes não bloqueiam o
+pipeline gravando no mesmo arquivo. Os demais arquivos nunca são alterados.
+
+Uso:
+    from src.pool import get_read_conn
+    with get_read_conn('data/db/reviews.db') as conn:
+        conn.execute("SELECT COUNT(*) FROM reviews").fetchone()
+"""
+from __future__ import annotations
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+# persistente no arquivo: só precisa ser aplicado pela conexão de escrita
+_WRITE_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+"""
+
+# mmap: as páginas do arquivo são lidas direto do page cache do SO, sem cópia para
+# o cache do SQLite (é só espaço de endereçamento; conta apenas o que é tocado)
+MMAP_SIZE = int(os.getenv("AMZ_SQLITE_MMAP_SIZE", str(1 << 30)))
+# cache de páginas por conexão de leitura, em KiB
+CACHE_SIZE_KB = int(os.getenv("AMZ_SQLITE_CACHE_KB", "65536"))
+
+# por conexão. Sem immutable=1: o pipeline regrava o mesmo arquivo com a API no ar
+_READ_PRAGMAS = f"""
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size={MMAP_SIZE};
+    PRAGMA cache_size=-{CACHE_SIZE_KB};
+"""
+
+DEFAULT_POOL_SIZE = 8
+
+# espera máxima por uma conexão livre, em segundos (a API responde 503 em vez de travar a thread)
+ACQUIRE_TIMEOUT = float(os.getenv("AMZ_POOL_TIMEOUT", "10"))
+
+
+class PoolTimeout(Exception):
+    """Nenhuma conexão de leitura ficou livre dentro do timeout de acquire()."""
+
+
+def _open(uri: str, row_factory=sqlite3.Row) -> sqlite3.Connection:
+    conn = sqlite3.connect(uri, uri=True, cached_statements=256, check_same_thread=False, isolation_level=None)
+    conn.row_factory = row_factory
+    return conn
+
+
+class ConnectionPool:
+    """Pool de conexões somente-leitura (mais uma de escrita, se writable) para um arquivo SQLite."""
+
+    def __init__(self, db_path: str, size: int = DEFAULT_POOL_SIZE, writable: bool = False):
+        self.db_path = os.path.abspath(db_path)
+        self.size = size
+        self.writable = writable
+        self.closed = False
+        self._idle: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+        self.write_conn = None
+        if writable:
+            self.write_conn = _open(f"file:{self.db_path}?mode=rw")
+            try:
+                self.write_conn.executescript(_WRITE_PRAGMAS)
+            except sqlite3.Error:
+                # ex.: arquivo em diretório somente-leitura; segue no journal padrão
+                pass
+
+    def acquire(self, timeout: Optional[float] = None) -> sqlite3.Connection:
+        """
+        Retira uma conexão de leitura (abre uma nova se o pool ainda não está cheio).
+        Com o pool cheio espera até `timeout` segundos (padrão: ACQUIRE_TIMEOUT) e
+        levanta PoolTimeout se nenhuma for devolvida.
+        """
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                return self._new_read_conn()
+        if timeout is None:
+            timeout = ACQUIRE_TIMEOUT
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise PoolTimeout(f"no free read connection for {self.db_path} after {timeout}s") from None
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Devolve a conexão ao pool (ou fecha, se o pool já foi fechado)."""
+        if self.closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self) -> None:
+        """Fecha as conexões ociosas e a de escrita; as em uso são fechadas ao serem devolvidas."""
+        self.closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        if self.write_conn is not None:
+            self.write_conn.close()
+
+    def _new_read_conn(self) -> sqlite3.Connection:
+        conn = _open(f"file:{self.db_path}?mode=ro")
+        conn.executescript(_READ_PRAGMAS)
+        return conn
+
+
+_pools: Dict[str, Tuple[Optional[int], ConnectionPool]] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str, writable: bool = False) -> ConnectionPool:
+    """
+    Pool do arquivo db_path, criado na primeira chamada. A chave inclui o inode:
+    se o arquivo for apagado e recriado, o pool antigo é fechado e substituído.
+    writable=True (só para o DB do próprio app) troca um pool somente-leitura já
+    existente por um com a conexão de escrita; sem ele, serve o pool que existir.
+    """
+    path = os.path.abspath(db_path)
+    try:
+        inode = os.stat(path).st_ino
+    except OSError:
+        inode = None
+
+    with _pools_lock:
+        cached = _pools.get(path)
+        if cached is not None:
+            if cached[0] == inode and (cached[1].writable or not writable):
+                return cached[1]
+            cached[1].close()
+        pool = ConnectionPool(path, writable=writable)
+        _pools[path] = (inode, pool)
+        return pool
+
+
+@contextmanager
+def get_read_conn(db_path: str) -> Iterator[sqlite3.Connection]:
+    """Context manager que empresta uma conexão de leitura do pool de db_path."""
+    with get_pool(db_path).read() as conn:
+        yield conn
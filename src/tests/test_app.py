@@ -0,0 +1,301 @@
+# src/tests/test_app.py
+import sqlite3
+import pytest
+from src import pool
+from src.app import app
+
+ROWS = [
+    ('r1', 'p1', 'great', 5, '2020-01-01 00:00:00', 'positive', 'Kindle E-reader (8th Generation)'),
+    ('r2', 'p1', 'bad', 1, '2020-02-01 00:00:00', 'negative', 'Kindle E-reader (8th Generation)'),
+    ('r3', 'p2', 'ok', 3, '2020-03-01 00:00:00', 'neutral', 'Echo Dot, 2nd Gen'),
+    ('r4', 'p2', 'love it', 4, '2020-04-01 00:00:00', 'positive', 'Echo Dot, 2nd Gen'),
+]
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "reviews.db"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE reviews (review_id TEXT, product_id TEXT, review_text TEXT, rating INTEGER,"
+        " review_date TEXT, sentiment TEXT, name TEXT, keywords TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO reviews (review_id, product_id, review_text, rating, review_date, sentiment, name)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ROWS,
+    )
+    conn.commit()
+    conn.close()
+    return str(path)
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    return app.test_client()
+
+def test_stats_aggregates_in_sql(client, db_path):
+    data = client.get(f"/api/stats?db={db_path}").get_json()
+    assert data['total'] == 4
+    assert data['avg_rating'] == pytest.approx(3.25)
+    assert data['pct_pos'] == pytest.approx(50.0)
+    assert data['pct_neu'] == pytest.approx(25.0)
+    assert data['pct_neg'] == pytest.approx(25.0)
+    assert data['top_products'] == {'p1': 2, 'p2': 2}
+
+def test_stats_empty_table(client, db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("DELETE FROM reviews")
+    conn.commit()
+    conn.close()
+    assert client.get(f"/api/stats?db={db_path}").get_json() == {"total": 0}
+
+def test_reviews_keyset_pagination(client, db_path):
+    app.config['DB_PATH'] = db_path
+    try:
+        first = client.get("/api/reviews?limit=3").get_json()
+        assert first['columns'][0] == 'review_id'
+        assert [r[0] for r in first['data']] == ['r4', 'r3', 'r2']
+        assert first['data'][0][first['columns'].index('rating')] == 4
+        assert 'total' not in first
+
+        second = client.get(f"/api/reviews?limit=3&cursor={first['next_cursor']}&with_total=1").get_json()
+        assert [r[0] for r in second['data']] == ['r1']
+        assert second['next_cursor'] is None
+        assert second['total'] == 4
+
+        assert client.get("/api/reviews?cursor=not-a-cursor").status_code == 400
+    finally:
+        app.config.pop('DB_PATH', None)
+
+def test_stats_etag_not_modified(client, db_path):
+    first = client.get(f"/api/stats?db={db_path}")
+    etag = first.headers['ETag']
+    assert etag
+    again = client.get(f"/api/stats?db={db_path}", headers={'If-None-Match': etag})
+    assert again.status_code == 304
+
+def test_reviews_pagination_reaches_rows_without_date(client, db_path):
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO reviews (review_id, product_id, review_date) VALUES (?, ?, NULL)",
+                     [('r5', 'p3'), ('r6', 'p3')])
+    conn.commit()
+    conn.close()
+    app.config['DB_PATH'] = db_path
+    try:
+        seen = []
+        cursor = None
+        while True:
+            url = "/api/reviews?limit=4" + (f"&cursor={cursor}" if cursor else "")
+            page = client.get(url).get_json()
+            seen += [r[0] for r in page['data']]
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+        assert seen == ['r4', 'r3', 'r2', 'r1', 'r6', 'r5']
+
+        page = client.get("/api/reviews?limit=3&with_total=1").get_json()
+        assert page['total'] == 6
+        assert len(page['data'][0]) == len(page['columns'])
+    finally:
+        app.config.pop('DB_PATH', None)
+
+def test_stats_uses_sentiment_code_when_present(client, db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("ALTER TABLE reviews ADD COLUMN sentiment_code INTEGER")
+    conn.execute("UPDATE reviews SET sentiment_code = CASE sentiment WHEN 'positive' THEN 1"
+                 " WHEN 'neutral' THEN 0 WHEN 'negative' THEN -1 END")
+    conn.commit()
+    conn.close()
+    data = client.get(f"/api/stats?db={db_path}").get_json()
+    assert (data['pct_pos'], data['pct_neu'], data['pct_neg']) == (50.0, 25.0, 25.0)
+
+def test_stats_top_products_limited_and_ordered(client, db_path):
+    conn = sqlite3.connect(db_path)
+    rows = [(f'x{p}-{i}', f'q{p:02d}') for p in range(12) for i in range(p + 1)]
+    conn.executemany("INSERT INTO reviews (review_id, product_id) VALUES (?, ?)", rows)
+    conn.execute("INSERT INTO reviews (review_id, product_id) VALUES ('nopid', NULL)")
+    conn.commit()
+    conn.close()
+    top = client.get(f"/api/stats?db={db_path}").get_json()['top_products']
+    assert list(top) == [f'q{p:02d}' for p in range(11, 1, -1)]
+    assert top['q11'] == 12
+
+def test_download_export_uses_server_file_wrapper():
+    from werkzeug.test import EnvironBuilder
+
+    class FileWrapper:
+        def __init__(self, f, block_size=8192):
+            self.f = f
+            self.block_size = block_size
+        def __iter__(self):
+            return iter(lambda: self.f.read(self.block_size), b'')
+        def close(self):
+            self.f.close()
+
+    environ = EnvironBuilder(path='/download/export').get_environ()
+    environ['wsgi.file_wrapper'] = FileWrapper
+    body = app(environ, lambda status, headers: None)
+    try:
+        # o servidor recebe o próprio wrapper e pode usar sendfile(2)
+        assert isinstance(body, FileWrapper)
+    finally:
+        body.close()
+
+def test_run_progress_streams_until_done(client):
+    from concurrent.futures import Future
+    from src import app as app_module
+
+    future = Future()
+    future.set_result(4)
+    app_module._jobs['job-x'] = future
+    try:
+        res = client.get("/api/run/job-x/progress")
+        assert res.mimetype == 'text/event-stream'
+        events = [line for line in res.get_data(as_text=True).splitlines() if line.startswith('data: ')]
+        assert events == ['data: {"job_id":"job-x","status":"done","rows":4,"stage":"done","pct":100}']
+        assert client.get("/api/run/nope/progress").status_code == 404
+    finally:
+        app_module._jobs.pop('job-x', None)
+
+def test_run_progress_stream_has_max_duration(client, monkeypatch):
+    from concurrent.futures import Future
+    from src import app as app_module
+
+    monkeypatch.setattr(app_module, 'SSE_MAX_SECONDS', 0.05)
+    monkeypatch.setattr(app_module, 'SSE_POLL_SECONDS', 0.01)
+    monkeypatch.setitem(app_module._jobs, 'job-slow', Future())
+    res = client.get("/api/run/job-slow/progress")
+    events = [line for line in res.get_data(as_text=True).splitlines() if line.startswith('data: ')]
+    assert events == ['data: {"job_id":"job-slow","status":"running"}']
+
+def test_finished_jobs_are_pruned(monkeypatch):
+    from concurrent.futures import Future
+    from src import app as app_module
+
+    monkeypatch.setattr(app_module, 'JOB_HISTORY', 2)
+    monkeypatch.setattr(app_module, '_jobs', {})
+    monkeypatch.setattr(app_module, '_job_progress', {})
+    running = Future()
+    app_module._jobs['running'] = running
+    for i in range(4):
+        done = Future()
+        done.set_result(i)
+        app_module._jobs[f'done-{i}'] = done
+        app_module._job_progress[f'done-{i}'] = {"stage": "done", "pct": 100}
+    app_module._job_progress['running'] = {"stage": "nlp", "pct": 30}
+    app_module._prune_jobs()
+    assert list(app_module._jobs) == ['running', 'done-2', 'done-3']
+    assert app_module._job_progress == {'running': {"stage": "nlp", "pct": 30}}
+
+def test_products_one_name_per_product(client, db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO reviews (review_id, product_id, name) VALUES ('r5', 'p3', NULL)")
+    conn.commit()
+    conn.close()
+    data = client.get(f"/api/products?db={db_path}").get_json()
+    assert data == {'p1': 'Kindle E', 'p2': 'Echo Dot', 'p3': 'p3'}
+
+def test_products_etag_not_modified(client, db_path):
+    first = client.get(f"/api/products?db={db_path}")
+    assert first.headers['Cache-Control'] == 'no-cache'
+    again = client.get(f"/api/products?db={db_path}", headers={'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+
+def test_products_probes_schema_once_per_db_version(client, db_path, monkeypatch):
+    from src import app as app_module
+
+    calls = []
+    probe = app_module._choose_product_name_column
+    monkeypatch.setattr(app_module, '_choose_product_name_column', lambda conn: calls.append(1) or probe(conn))
+    for _ in range(3):
+        assert client.get(f"/api/products?db={db_path}").status_code == 200
+    assert len(calls) == 1
+
+def test_products_quotes_fallback_column(client, tmp_path):
+    path = str(tmp_path / "odd.db")
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE reviews (review_id TEXT, product_id TEXT, "item name" TEXT)')
+    conn.execute("INSERT INTO reviews VALUES ('r1', 'p1', 'Echo Dot, 2nd Gen')")
+    conn.commit()
+    conn.close()
+    assert client.get(f"/api/products?db={path}").get_json() == {'p1': 'Echo Dot'}
+
+def test_reviews_head_does_not_hold_connections(client, db_path):
+    app.config['DB_PATH'] = db_path
+    try:
+        for _ in range(pool.DEFAULT_POOL_SIZE + 2):
+            assert client.head("/api/reviews").status_code == 200
+        assert [r[0] for r in client.get("/api/reviews").get_json()['data']] == ['r4', 'r3', 'r2', 'r1']
+    finally:
+        app.config.pop('DB_PATH', None)
+
+def test_reviews_busy_pool_and_sql_errors_set_the_status(client, db_path, monkeypatch):
+    from src import app as app_module
+
+    app.config['DB_PATH'] = db_path
+    monkeypatch.setattr(pool, "ACQUIRE_TIMEOUT", 0.05)
+    db_pool = app_module._app_pool(db_path)
+    monkeypatch.setattr(db_pool, "size", 1)
+    held = db_pool.acquire()
+    try:
+        response = client.get("/api/reviews")
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == "1"
+    finally:
+        db_pool.release(held)
+        app.config.pop('DB_PATH', None)
+
+    # consulta que falha (tabela sem as colunas esperadas): erro antes do corpo, não um 200 cortado
+    conn = sqlite3.connect(db_path)
+    conn.execute("ALTER TABLE reviews DROP COLUMN keywords")
+    conn.commit()
+    conn.close()
+    app.config['DB_PATH'] = db_path
+    try:
+        app.config['PROPAGATE_EXCEPTIONS'] = False
+        assert client.get("/api/reviews").status_code == 500
+        # a conexão voltou ao pool mesmo com o erro
+        assert db_pool._idle.qsize() == db_pool._opened
+    finally:
+        app.config.pop('PROPAGATE_EXCEPTIONS', None)
+        app.config.pop('DB_PATH', None)
+
+def test_busy_pool_returns_503(client, db_path, monkeypatch):
+    monkeypatch.setattr(pool, "ACQUIRE_TIMEOUT", 0.05)
+    db_pool = pool.get_pool(db_path)
+    monkeypatch.setattr(db_pool, "size", 1)
+    held = db_pool.acquire()
+    try:
+        response = client.get(f"/api/stats?db={db_path}")
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == "1"
+    finally:
+        db_pool.release(held)
+    assert client.get(f"/api/stats?db={db_path}").status_code == 200
+
+def test_client_supplied_db_is_never_written(client, db_path):
+    import hashlib, os
+    before = hashlib.sha1(open(db_path, 'rb').read()).hexdigest()
+    for url in ("/api/stats", "/api/products"):
+        assert client.get(f"{url}?db={db_path}").status_code == 200
+    assert hashlib.sha1(open(db_path, 'rb').read()).hexdigest() == before
+    assert not os.path.exists(db_path + "-wal")
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+        assert conn.execute("SELECT name FROM sqlite_master WHERE type='index'").fetchall() == []
+    finally:
+        conn.close()
+
+def test_configured_db_gets_indexes_on_first_use(client, db_path):
+    app.config['DB_PATH'] = db_path
+    try:
+        assert client.get("/api/reviews").status_code == 200
+    finally:
+        app.config.pop('DB_PATH', None)
+    conn = sqlite3.connect(db_path)
+    try:
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    finally:
+        conn.close()
+    assert {'idx_reviews_date', 'idx_reviews_product'} <= names
@@ -26,3 +26,31 @@ def test_run_pipeline_with_db():
     assert os.path.exists(TEST_CSV_OUT)
     assert os.path.exists(TEST_DB)
     assert len(df) == 5
+
+def test_run_pipeline_reuses_processed_cache(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    from src import main
+
+    first = run_pipeline(TEST_CSV_IN, nrows=5, cache_dir=str(tmp_path), log_level='DEBUG')
+    # segunda execução com o mesmo arquivo/nrows não passa por extract
+    monkeypatch.setattr(main, 'extract', lambda *a, **k: pytest.fail("extract chamado com cache válido"))
+    # cache válido também não carrega o léxico do VADER
+    main.nlp._get_sia.cache_clear()
+    second = run_pipeline(TEST_CSV_IN, nrows=5, cache_dir=str(tmp_path), log_level='DEBUG')
+    assert main.nlp._get_sia.cache_info().currsize == 0
+    assert second.dtypes.equals(first.dtypes)
+    assert second['review_id'].tolist() == first['review_id'].tolist()
+
+def test_run_pipeline_keeps_one_cache_entry_per_source(tmp_path):
+    pytest.importorskip("pyarrow")
+    run_pipeline(TEST_CSV_IN, nrows=5, cache_dir=str(tmp_path), log_level='DEBUG')
+    run_pipeline(TEST_CSV_IN, nrows=6, cache_dir=str(tmp_path), log_level='DEBUG')
+    # a entrada de nrows=5 foi substituída pela nova
+    assert len(list(tmp_path.glob('*.parquet'))) == 1
+    assert len(list(tmp_path.glob('*.schema.json'))) == 1
+
+def test_run_pipeline_missing_source_skips_cache(tmp_path):
+    cache_dir = tmp_path / 'cache'
+    with pytest.raises(FileNotFoundError):
+        run_pipeline(str(tmp_path / 'nope.csv'), cache_dir=str(cache_dir), log_level='DEBUG')
+    assert not cache_dir.exists()
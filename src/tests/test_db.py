@@ -1,7 +1,7 @@
 # tests/test_db.py
 import sqlite3
 import pandas as pd
-from src.db import init_db, save_df
+from src.db import init_db, save_df, with_sentiment_code
 import os
 
 def test_db_save_roundtrip(tmp_path):
@@ -22,3 +22,44 @@ def test_db_save_roundtrip(tmp_path):
     res = pd.read_sql('SELECT COUNT(*) as cnt FROM reviews', conn)
     conn.close()
     assert int(res['cnt'].iloc[0]) == 2
+
+def test_sentiment_code_saved_with_rows(tmp_path):
+    engine = init_db(str(tmp_path / "codes.db"))
+    df = pd.DataFrame({
+        'review_id': ['r1', 'r2', 'r3', 'r4'],
+        'sentiment': pd.Categorical(['positive', 'neutral', 'negative', None])
+    })
+    save_df(engine, with_sentiment_code(df))
+    assert 'sentiment_code' not in df.columns
+    res = pd.read_sql('SELECT review_id, sentiment_code FROM reviews ORDER BY review_id', engine)
+    assert res['sentiment_code'].iloc[:3].tolist() == [1, 0, -1]
+    assert pd.isna(res['sentiment_code'].iloc[3])
+    ddl = pd.read_sql("SELECT sql FROM sqlite_master WHERE name='reviews'", engine)['sql'].iloc[0]
+    assert '"sentiment_code" BIGINT' in ddl
+
+def test_save_df_keeps_product_index(tmp_path):
+    engine = init_db(str(tmp_path / "idx.db"))
+    save_df(engine, pd.DataFrame({'review_id': ['r1'], 'product_id': ['p1'], 'review_date': ['2020-01-01']}))
+    idx = pd.read_sql("SELECT name FROM sqlite_master WHERE type='index'", engine)
+    assert {'idx_reviews_product', 'idx_reviews_date'} <= set(idx['name'])
+
+def test_save_df_replaces_table(tmp_path):
+    engine = init_db(str(tmp_path / "bulk.db"))
+    save_df(engine, pd.DataFrame({'review_id': ['old'], 'rating': [1]}))
+    df = pd.DataFrame({
+        'review_id': ['r1', 'r2'],
+        'rating': [5.0, None],
+        'review_date': pd.to_datetime(['2020-01-01 05:00:00+00:00', None], utc=True),
+    })
+    save_df(engine, df)
+    res = pd.read_sql('SELECT * FROM reviews ORDER BY review_id', engine)
+    assert res['review_id'].tolist() == ['r1', 'r2']
+    assert res['rating'].iloc[0] == 5.0 and pd.isna(res['rating'].iloc[1])
+    assert res['review_date'].tolist() == ['2020-01-01 05:00:00.000000', None]
+
+def test_save_df_in_chunks(tmp_path):
+    engine = init_db(str(tmp_path / "chunks.db"))
+    df = pd.DataFrame({'review_id': [f'r{i}' for i in range(5)], 'rating': [1.0, None, 3.0, 4.0, 5.0]})
+    save_df(engine, df, chunk_rows=2)
+    res = pd.read_sql('SELECT * FROM reviews ORDER BY review_id', engine)
+    pd.testing.assert_frame_equal(res, df)
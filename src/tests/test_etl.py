@@ -1,6 +1,8 @@
 # tests/test_etl.py
 import pandas as pd
-from src.etl import extract, transform
+import pytest
+from src import etl
+from src.etl import extract, transform, extract_first_asin, extract_first_asins
 
 def test_extract_transform_small_sample(tmp_path):
     # cria um CSV minimal para teste
@@ -15,3 +17,77 @@ def test_extract_transform_small_sample(tmp_path):
     df_clean = transform(df_raw)
     assert 'review_text' in df_clean.columns
     assert df_clean['review_text'].notna().all()
+
+def test_extract_first_asins_matches_scalar():
+    raw = pd.Series(["B01N32NCPM", "B01,B02", " ['B00A', 'B00B'] ", '("x1", "x2")', "[B0X, B0Y]",
+                     "[]", "a|b,c", "p;q r", "'abc'", None, "", "[B01 B02]", "(B01)", "('B01')",
+                     "[['a']]", "1,2", "0x10,2", "'a,b', 'c'", "True,x", "B01, [x]"], dtype=object)
+    assert extract_first_asins(raw).tolist() == raw.apply(extract_first_asin).tolist()
+
+def test_extract_arrow_matches_pandas(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    csv = tmp_path / "sample.csv"
+    csv.write_text(
+        "id,reviews.date,reviews.rating,reviews.username,reviews.doRecommend\n"
+        "a,2017-09-03T00:00:00.000Z,5,None,true\n"
+        "b,2018-01-02,,,false\n"
+        "c,,3,bob,\n"
+    )
+    arrow_df = etl.extract(str(csv))
+    monkeypatch.setattr(etl, "_ARROW_AVAILABLE", False)
+    pandas_df = etl.extract(str(csv))
+    pd.testing.assert_frame_equal(arrow_df, pandas_df)
+
+def test_transform_drops_missing_text_with_either_reader(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    csv = tmp_path / "texts.csv"
+    csv.write_text(
+        "id,asins,reviews.text,reviews.rating\n"
+        "a,B01,Great product,5\n"
+        "b,B01,,4\n"
+        "c,B01,NA,3\n"
+        "d,B01,None,2\n"
+        "e,B01,   ,1\n"
+    )
+    arrow_raw = etl.extract(str(csv))
+    monkeypatch.setattr(etl, "_ARROW_AVAILABLE", False)
+    pandas_raw = etl.extract(str(csv))
+    pd.testing.assert_frame_equal(arrow_raw, pandas_raw)
+    monkeypatch.setattr(etl, "_ARROW_AVAILABLE", True)
+    arrow_out = etl.transform(arrow_raw)
+    monkeypatch.setattr(etl, "_ARROW_AVAILABLE", False)
+    pandas_out = etl.transform(pandas_raw)
+    assert arrow_out['review_id'].tolist() == pandas_out['review_id'].tolist() == ['a']
+
+def test_text_features_arrow_matches_pandas(monkeypatch):
+    pytest.importorskip("pyarrow")
+    text = pd.Series(['Great  product!', 'a\xa0b c', '   ', 'nan', 'NaN', '', 'ok\u3000fine'])
+    arrow = etl._text_features(text)
+    monkeypatch.setattr(etl, "_ARROW_AVAILABLE", False)
+    plain = etl._text_features(text)
+    assert arrow[0].tolist() == plain[0].tolist() == [len(t) for t in text]
+    assert arrow[1].tolist() == plain[1].tolist() == [len(t.split()) for t in text]
+    assert list(arrow[2]) == list(plain[2]) == [True, True, False, False, False, False, True]
+
+def test_processed_parquet_roundtrip(tmp_path):
+    pytest.importorskip("pyarrow")
+    df = pd.DataFrame({'review_id': ['r1', 'r2'], 'rating': [5.0, None],
+                       'review_date': pd.to_datetime(['2020-01-01', None], utc=True)})
+    path = etl.save_processed(df, str(tmp_path / "out" / "reviews.parquet"))
+    pd.testing.assert_frame_equal(etl.extract(path, nrows=1), df.iloc[:1])
+
+def test_optimize_dtypes_keeps_values():
+    df = pd.DataFrame({'brand': ['Amazon'] * 4, 'reviews_username': ['a', 'b', 'c', 'd'],
+                       'rating': [5, 4, 1, 3], 'review_len': [10, 300, 2, 0]})
+    out = etl.optimize_dtypes(df.copy())
+    assert out['brand'].dtype == 'category'
+    assert out['reviews_username'].dtype == object
+    assert out['rating'].dtype == 'int8' and out['review_len'].dtype == 'int16'
+    pd.testing.assert_frame_equal(out.astype(df.dtypes.to_dict()), df)
+
+def test_transform_coalesces_duplicate_columns():
+    df = pd.DataFrame([['a', None, 'x', 'good'], [None, 'b', 'y', 'bad'], [None, None, 'z', 'ok']],
+                      columns=['id', 'reviews_id', 'brand', 'reviews_text'])
+    out = transform(df)
+    assert out.columns.tolist().count('review_id') == 1
+    assert out['review_id'].tolist() == ['a', 'b', None]
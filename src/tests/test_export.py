@@ -0,0 +1,41 @@
+# src/tests/test_export.py
+import sqlite3
+import pytest
+from src import export
+from src.export import export_for_dashboard, export_for_dashboard_streaming, iter_dashboard_csv
+
+def test_streaming_export_matches_pandas_export(tmp_path, monkeypatch):
+    db = tmp_path / "reviews.db"
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE reviews (review_id TEXT, product_id TEXT, review_date TEXT, rating REAL,"
+                 " sentiment TEXT, keywords TEXT, review_text TEXT)")
+    conn.executemany("INSERT INTO reviews VALUES (?, ?, ?, ?, ?, ?, ?)", [
+        ('r1', 'p1', '2018-05-23 00:00:00.000000', 5.0, 'positive', 'great,price', 'Great, "cheap" price'),
+        ('r2', 'p2', '2017-01-03 05:06:07.000000', None, 'negative', '', 'bad'),
+        ('r3', 'p2', None, 3.5, 'neutral', None, 'ok'),
+    ])
+    conn.commit()
+    conn.close()
+
+    # padrão é pandas mesmo com polars instalado
+    monkeypatch.setattr(export, "_export_polars", lambda *a: pytest.fail("polars usado sem opt-in"))
+    out_pd, rows_pd = export_for_dashboard(str(db), str(tmp_path / "pd.csv"))
+    monkeypatch.undo()
+    out_st, rows_st = export_for_dashboard_streaming(str(db), str(tmp_path / "stream.csv"))
+
+    assert rows_pd == rows_st == 3
+    with open(out_pd, encoding='utf-8') as a, open(out_st, encoding='utf-8') as b:
+        expected = a.read()
+        assert b.read() == expected
+    assert "".join(iter_dashboard_csv(str(db), batch_rows=2)) == expected
+
+    out_ch, rows_ch = export_for_dashboard(str(db), str(tmp_path / "chunked.csv"), chunk_rows=1, backend='pandas')
+    assert rows_ch == 3
+    with open(out_ch, encoding='utf-8') as f:
+        assert f.read() == expected
+
+    pytest.importorskip("polars")
+    out_pl, rows_pl = export_for_dashboard(str(db), str(tmp_path / "polars.csv"), backend='polars')
+    assert rows_pl == 3
+    with open(out_pl, encoding='utf-8') as f:
+        assert f.read() == expected
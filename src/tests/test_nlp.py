@@ -1,13 +1,18 @@
 # src/tests/test_nlp.py
 import pytest
 import pandas as pd
-from src.nlp import clean_text, tokenize_and_remove_stopwords, sentiment_vader, top_keywords, apply_nlp
+from src import nlp
+from src.nlp import clean_text, clean_text_series, tokenize_and_remove_stopwords, sentiment_vader, top_keywords, apply_nlp
 
 def test_clean_text():
     text = "<p>Hello World! 123</p>"
     cleaned = clean_text(text)
     assert cleaned == "hello world"
 
+def test_clean_text_series_matches_clean_text():
+    texts = pd.Series(["<p>Hello World! 123</p>", "", "  A\xa0b\n<br/>C\u3000d ", "ÉTÉ 2x fun", "<b>x"])
+    assert clean_text_series(texts).tolist() == [clean_text(t) for t in texts]
+
 def test_tokenize_and_remove_stopwords():
     text = "This is a simple test sentence."
     tokens = tokenize_and_remove_stopwords(text)
@@ -17,11 +22,18 @@ def test_tokenize_and_remove_stopwords():
     assert "sentence" in tokens
     assert "this" not in tokens
 
+def test_tokens_from_clean_matches_treebank():
+    tokenizer = pytest.importorskip("nltk.tokenize").TreebankWordTokenizer()
+    cleaned = clean_text("I cannot believe it, gonna buy two! Wanna try? Gotta gimme, lemme see cannoli")
+    expected = [t for t in tokenizer.tokenize(cleaned) if t not in nlp.STOPWORDS]
+    assert nlp._tokens_from_clean(cleaned) == expected
+
 def test_sentiment_vader():
     assert sentiment_vader("I love this product!") == "positive"
     assert sentiment_vader("This is terrible.") == "negative"
     assert sentiment_vader("It is okay.") == "neutral"
     assert sentiment_vader("") == "neutral"
+    assert sentiment_vader("  !  ") == "neutral"
 
 def test_top_keywords():
     text = "apple banana apple orange banana apple"
@@ -44,3 +56,77 @@ def test_apply_nlp():
     assert df_nlp.loc[0, "sentiment"] == "positive"
     assert df_nlp.loc[1, "sentiment"] == "negative"
     assert df_nlp.loc[2, "sentiment"] == "neutral"
+    assert list(df_nlp["sentiment"].cat.categories) == ["negative", "neutral", "positive"]
+
+def test_apply_nlp_parallel_matches_serial(monkeypatch):
+    pytest.importorskip("joblib")
+    df = pd.DataFrame({"review_text": ["I love this product!", "This is terrible.", "ok", "I love this product!"]})
+    serial = apply_nlp(df, n_jobs=1)
+    monkeypatch.setattr(nlp, "PARALLEL_MIN_TEXTS", 1)
+    pd.testing.assert_frame_equal(apply_nlp(df, n_jobs=2), serial)
+
+def test_apply_nlp_chunks_match_single_block():
+    df = pd.DataFrame({"review_text": ["I love this product!", None, "This is terrible.", "ok", "I love this product!"]})
+    pd.testing.assert_frame_equal(apply_nlp(df, chunk_size=2), apply_nlp(df, chunk_size=None))
+    assert apply_nlp(df.iloc[:0])["sentiment"].empty
+
+def test_char_run_collapse_keeps_vader_scores():
+    sia = nlp._get_sia()
+    if sia is None:
+        pytest.skip("VADER lexicon not installed")
+    for text in ["Love it!!!!!!", "Great!!!!!!", "Bad??????", "sooooooo good!!!!!", "ok :))))))"]:
+        collapsed = nlp._CHAR_RUN_RE.sub(r"\1" * nlp.CHAR_RUN_KEEP, text)
+        assert sia.polarity_scores(collapsed) == sia.polarity_scores(text)
+
+def test_vader_compound_matches_polarity_scores():
+    sia = nlp._get_sia()
+    if sia is None:
+        pytest.skip("VADER lexicon not installed")
+    for text in ["The screen is great but the battery is awful.",
+                 "I hated the setup, but now I LOVE it!",
+                 "Not bad but not good either",
+                 "good but but bad", "It works, but..."]:
+        assert nlp._vader_compound(sia, text) == sia.polarity_scores(text)["compound"]
+
+def test_vader_compound_falls_back_on_other_internals():
+    class OtherSIA:
+        constants = type("C", (), {"BOOSTER_DICT": {}, "PUNC_LIST": ["!"]})
+
+        def sentiment_valence(self, valence, sentitext, item, i, sentiments):
+            return sentiments + [1.0]
+
+        def _but_check(self, words, sentiments, extra):
+            return sentiments
+
+        def score_valence(self, sentiments, text):
+            return {"compound": 0.9}
+
+        def polarity_scores(self, text):
+            return {"compound": 0.25}
+
+    nlp._vader_punc_set.cache_clear()
+    try:
+        assert nlp._vader_compound(OtherSIA(), "great but fine") == 0.25
+    finally:
+        nlp._vader_punc_set.cache_clear()
+
+def test_sentiment_guards_vader_input(monkeypatch):
+    seen = []
+
+    class StubSIA:
+        def polarity_scores(self, text):
+            seen.append(text)
+            return {"compound": 0.6}
+
+    stub = StubSIA()
+    monkeypatch.setattr(nlp, "_get_sia", lambda: stub)
+    nlp._sentiment_label.cache_clear()
+    try:
+        assert sentiment_vader(":)") == "positive"
+        # emoticon flood: lexicon fallback, VADER never called
+        assert sentiment_vader(":-) :-( " * 40) == "neutral"
+        assert sentiment_vader("great!!!!!!!!!!" + " fine" * 1000) == "positive"
+        assert seen[0] == ":)"
+        assert len(seen) == 2 and seen[1].startswith("great!!!! ") and len(seen[1]) <= nlp.VADER_MAX_CHARS
+    finally:
+        nlp._sentiment_label.cache_clear()